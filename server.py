@@ -2,17 +2,25 @@ import asyncio
 import os
 import sys
 import json
+import re
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import secrets
 import time
+import queue
+import threading
+from contextlib import contextmanager
 
 from datetime import datetime, timedelta
 import redis
-from flask import Flask, request, jsonify, session
+from flask import Flask, request, session
 from flask_cors import CORS
 from werkzeug.security import generate_password_hash, check_password_hash
-from functools import wraps
-from collections import defaultdict
+from functools import wraps, reduce
+from operator import itemgetter
+from collections import defaultdict, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
@@ -20,8 +28,12 @@ from mcp.types import Tool, TextContent
 from databricks import sql
 from dotenv import load_dotenv
 from functools import lru_cache
-from multiprocessing import Pool, cpu_count
 import hashlib
+import msgpack
+import orjson
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 from hubspot import HubSpot
 from openai import OpenAI
 
@@ -35,15 +47,41 @@ HUBSPOT_API_KEY = os.getenv('HUBSPOT_ACCESS_TOKEN')
 if not HUBSPOT_API_KEY:
     raise ValueError("HUBSPOT_API_KEY environment variable not set")
 
+# Shared keep-alive session for HubSpot: reuses TCP/TLS connections to
+# api.hubapi.com across calls and retries rate limits / transient 5xx.
+hubspot_session = requests.Session()
+hubspot_session.headers.update({'Authorization': f'Bearer {HUBSPOT_API_KEY}'})
+hubspot_session.mount('https://', HTTPAdapter(
+    pool_connections=20,
+    pool_maxsize=50,
+    # HubSpot POSTs here are all reads (search, batch/read), so they are safe to retry
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({'GET', 'POST'}),
+        raise_on_status=False,  # hand back the last response; callers check status_code
+    ),
+))
+
 # OpenAI client for LLM-powered specialty expansion (optional — degrades gracefully)
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 openai_client = None
 if OPENAI_API_KEY:
-    openai_client = OpenAI(api_key=OPENAI_API_KEY)
+    # One client per worker: the SDK keeps a pooled keep-alive HTTP client, so
+    # expansion calls reuse connections. Its default timeout is 10 minutes;
+    # bound it so a stuck call can't hold a request (and its coalesced waiters)
+    openai_client = OpenAI(api_key=OPENAI_API_KEY, timeout=20.0, max_retries=1)
+# The expansion is a small pick-from-a-list task, so a small, fast model is enough
+SPECIALTY_EXPANSION_MODEL = os.getenv('SPECIALTY_EXPANSION_MODEL', 'gpt-4o-mini')
 
 # Clay webhook for company discovery (optional)
 CLAY_WEBHOOK_URL = os.getenv('CLAY_WEBHOOK_URL')
 
+# Dump full request/webhook payloads to stderr (off in production; serializing
+# large payloads on every request is measurable overhead)
+DEBUG_PAYLOADS = os.getenv('DEBUG_PAYLOADS', 'false').lower() == 'true'
+
 # Create the server
 app = Server("gtm-mcp-server")
 flask_app = Flask(__name__)
@@ -106,63 +144,336 @@ def require_auth(f):
     @wraps(f)
     def decorated(*args, **kwargs):
         if not session.get('authenticated'):
-            return jsonify({'error': 'Unauthorized', 'code': 'AUTH_REQUIRED'}), 401
+            return ojsonify({'error': 'Unauthorized', 'code': 'AUTH_REQUIRED'}), 401
         return f(*args, **kwargs)
     return decorated
 
 
+# ─── JSON Serialization ────────────────────────────────────────────────────────
+# orjson serializes in C and emits UTF-8 bytes directly. default=str keeps the
+# old json.dumps(default=str) behaviour for Decimal/date values from Databricks;
+# OPT_PASSTHROUGH_DATETIME routes datetimes through it too, so they stay
+# "YYYY-MM-DD HH:MM:SS" rather than orjson's RFC 3339 "YYYY-MM-DDTHH:MM:SS".
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def ojsonify(obj):
+    """Drop-in replacement for flask.jsonify backed by orjson."""
+    return flask_app.response_class(
+        orjson.dumps(obj, default=str, option=_ORJSON_OPTIONS),
+        mimetype='application/json'
+    )
+
+
+def ojsonify_list(items, chunk_size=512):
+    """
+    Like ojsonify for a top-level list, but large lists are streamed as a
+    chunked response: rows are encoded chunk_size at a time, so the full
+    JSON body is never held in memory alongside the Python objects.
+    """
+    if len(items) <= chunk_size:
+        return ojsonify(items)
+
+    def generate():
+        yield b'['
+        for start in range(0, len(items), chunk_size):
+            chunk = orjson.dumps(items[start:start + chunk_size], default=str, option=_ORJSON_OPTIONS)
+            if start:
+                yield b','
+            yield chunk[1:-1]  # strip the chunk's own brackets
+        yield b']'
+
+    return flask_app.response_class(generate(), mimetype='application/json')
+
+
+def tool_json(obj):
+    """Compact JSON text for MCP tool responses (no indentation — Claude parses it)."""
+    return orjson.dumps(obj, default=str, option=_ORJSON_OPTIONS).decode()
+
+
 # CORS: allow Vercel frontend domain + localhost for dev
 ALLOWED_ORIGINS = os.getenv('ALLOWED_ORIGINS', 'https://deals-dashboard-rho.vercel.app').split(',')
 CORS(flask_app, origins=ALLOWED_ORIGINS, supports_credentials=True)
 # CORS(flask_app, resources={r"/api/*": {"origins": ALLOWED_ORIGINS}}, supports_credentials=True)
 
 # Redis setup
+# One bounded pool per worker process, shared by every request thread. Set
+# REDIS_SOCKET_PATH when Redis runs on the same host to skip TCP entirely.
 try:
-    redis_client = redis.Redis(
-        host=os.getenv('REDIS_HOST', 'localhost'),
-        port=int(os.getenv('REDIS_PORT', 6379)),
-        decode_responses=True,
-        socket_connect_timeout=2
-    )
+    _redis_pool_kwargs = {
+        'max_connections': int(os.getenv('REDIS_MAX_CONNECTIONS', 32)),
+        'timeout': 5,  # seconds to wait for a free connection before erroring
+        'socket_connect_timeout': 2,
+        'health_check_interval': 30,
+    }
+    if os.getenv('REDIS_SOCKET_PATH'):
+        _redis_pool = redis.BlockingConnectionPool(
+            connection_class=redis.UnixDomainSocketConnection,
+            path=os.getenv('REDIS_SOCKET_PATH'),
+            **_redis_pool_kwargs
+        )
+    else:
+        _redis_pool = redis.BlockingConnectionPool(
+            host=os.getenv('REDIS_HOST', 'localhost'),
+            port=int(os.getenv('REDIS_PORT', 6379)),
+            **_redis_pool_kwargs
+        )
+    # decode_responses stays off: Clay cache payloads are binary msgpack
+    redis_client = redis.Redis(connection_pool=_redis_pool)
     redis_client.ping()
     REDIS_ENABLED = True
 except:
     redis_client = None
     REDIS_ENABLED = False
 
-# OPTIMIZATION: Simple in-memory cache for query results
-_query_cache = {}
+# OPTIMIZATION: Two-tier cache for query results — in-memory dict (L1) per worker,
+# Redis (L2, msgpack) when available so workers share results and survive restarts
+# L1 is a bounded LRU (oldest-used entries evicted past QUERY_CACHE_MAX) with TTL expiry on read
+_query_cache = OrderedDict()
+_query_cache_lock = threading.Lock()
+_query_cache_max = int(os.getenv('QUERY_CACHE_MAX', 1000))
 _cache_ttl = 3600  # 1 hour cache
 
+_KEY_SCALARS = (str, int, float, bool, type(None))
+
+def _freeze(obj):
+    """Recursively turn a value into a hashable, deterministically-ordered tuple form."""
+    if isinstance(obj, _KEY_SCALARS):
+        return obj
+    if isinstance(obj, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in obj.items()))
+    if isinstance(obj, (list, tuple)):
+        return tuple(_freeze(v) for v in obj)
+    if isinstance(obj, (set, frozenset)):
+        return tuple(sorted(repr(_freeze(v)) for v in obj))
+    # Exotic types: fall back to a JSON rendering so the repr stays stable
+    return json.dumps(obj, sort_keys=True, default=str)
+
 def get_cache_key(query_type, **kwargs):
     """Generate a cache key from query parameters"""
-    key_string = f"{query_type}:" + json.dumps(kwargs, sort_keys=True)
-    return hashlib.md5(key_string.encode()).hexdigest()
+    canonical = tuple(sorted((k, _freeze(v)) for k, v in kwargs.items()))
+    return hashlib.blake2b(f"{query_type}:{canonical!r}".encode(), digest_size=16).hexdigest()
+
+def _query_redis_key(cache_key):
+    """Redis key for a msgpack-encoded query cache entry."""
+    return f"q:{cache_key}"
+
+def _get_local_cached(cache_key):
+    """L1 lookup: the cached result if present and not expired, else None."""
+    with _query_cache_lock:
+        cached = _query_cache.get(cache_key)
+        if cached is not None:
+            result, timestamp = cached
+            if time.time() - timestamp < _cache_ttl:
+                _query_cache.move_to_end(cache_key)
+                return result
+            del _query_cache[cache_key]
+    return None
+
+def _set_local_cached(cache_key, result, timestamp):
+    """L1 insert; evicts least recently used entries beyond _query_cache_max."""
+    with _query_cache_lock:
+        _query_cache[cache_key] = (result, timestamp)
+        _query_cache.move_to_end(cache_key)
+        while len(_query_cache) > _query_cache_max:
+            _query_cache.popitem(last=False)
 
 def get_cached_result(cache_key):
-    """Get cached result if available and not expired"""
-    if cache_key in _query_cache:
-        result, timestamp = _query_cache[cache_key]
-        import time
-        if time.time() - timestamp < _cache_ttl:
-            return result
+    """Get cached result if available and not expired (memory first, then Redis)"""
+    result = _get_local_cached(cache_key)
+    if result is not None or not REDIS_ENABLED or not redis_client:
+        return result
+    try:
+        raw = redis_client.get(_query_redis_key(cache_key))
+        if raw:
+            result = msgpack.unpackb(raw, raw=False)
+            _set_local_cached(cache_key, result, time.time())
+    except Exception as e:
+        print(f"[QUERY CACHE] Redis load failed: {e}", file=sys.stderr)
+    return result
+
+def set_cached_result(cache_key, result, lock_token=None):
+    """
+    Cache a result with timestamp (memory + Redis). Pass the lock_token from
+    get_cached_or_lock to release that compute lock in the same round trip.
+    """
+    # Both tiers hold the msgpack round-tripped value (Decimal/datetime as str,
+    # tuples as lists), so a hit has the same types whichever tier answers
+    packed = msgpack.packb(result, use_bin_type=True, default=str)
+    _set_local_cached(cache_key, msgpack.unpackb(packed, raw=False), time.time())
+    if not REDIS_ENABLED or not redis_client:
+        return
+    try:
+        with redis_client.pipeline(transaction=False) as pipe:
+            pipe.setex(_query_redis_key(cache_key), _cache_ttl, packed)
+            if lock_token:
+                _cache_release_lock(keys=[_query_redis_key(cache_key) + ":lock"], args=[lock_token], client=pipe)
+            pipe.execute()
+    except Exception as e:
+        print(f"[QUERY CACHE] Redis save failed: {e}", file=sys.stderr)
+
+# One round trip for "return the cached value, or take the compute lock":
+#   {1, value} hit · {0} miss and caller now holds the lock · {2} miss, someone else computing
+_CACHE_GET_OR_LOCK_LUA = """
+local v = redis.call('GET', KEYS[1])
+if v then return {1, v} end
+if redis.call('SET', KEYS[2], ARGV[2], 'NX', 'EX', ARGV[1]) then return {0} end
+return {2}
+"""
+# Compare-and-delete: only the holder's token releases the lock, so a writer whose
+# lock already expired can't release one another worker has since taken
+_CACHE_RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) end
+return 0
+"""
+_cache_get_or_lock = redis_client.register_script(_CACHE_GET_OR_LOCK_LUA) if REDIS_ENABLED else None
+_cache_release_lock = redis_client.register_script(_CACHE_RELEASE_LOCK_LUA) if REDIS_ENABLED else None
+_CACHE_LOCK_TTL = 30  # seconds; bounds how long a crashed computer can block others
+
+def get_cached_or_lock(cache_key, wait_timeout=_CACHE_LOCK_TTL):
+    """
+    Cache lookup that prevents a dog-pile on expensive misses across workers.
+    Returns (result, lock_token):
+      - (result, None) on a hit
+      - (None, token) on a miss where this caller holds the lock and should
+        compute, then set_cached_result or release_cache_lock with the token
+      - (None, None) if Redis is unavailable or another worker's compute
+        didn't finish within wait_timeout — compute without the lock
+    """
+    result = _get_local_cached(cache_key)
+    if result is not None:
+        return result, None
+    if not REDIS_ENABLED or not _cache_get_or_lock:
+        return None, None
+
+    redis_key = _query_redis_key(cache_key)
+    token = secrets.token_hex(8)
+    deadline = time.time() + wait_timeout
+    while True:
+        try:
+            reply = _cache_get_or_lock(keys=[redis_key, redis_key + ":lock"], args=[_CACHE_LOCK_TTL, token])
+        except Exception as e:
+            print(f"[QUERY CACHE] Redis get-or-lock failed: {e}", file=sys.stderr)
+            return None, None
+        if reply[0] == 1:
+            result = msgpack.unpackb(reply[1], raw=False)
+            _set_local_cached(cache_key, result, time.time())
+            return result, None
+        if reply[0] == 0:
+            return None, token
+        if time.time() >= deadline:
+            return None, None
+        time.sleep(0.25)
+
+def release_cache_lock(cache_key, lock_token):
+    """Release a compute lock from get_cached_or_lock without caching a result."""
+    if not REDIS_ENABLED or not redis_client or not lock_token:
+        return
+    try:
+        _cache_release_lock(keys=[_query_redis_key(cache_key) + ":lock"], args=[lock_token])
+    except Exception as e:
+        print(f"[QUERY CACHE] Redis lock release failed: {e}", file=sys.stderr)
+
+# Short-lived Redis cache of whole JSON responses for read-only HubSpot-backed
+# endpoints, keyed by the canonical query string. Repeat loads (back navigation,
+# auto-refresh) skip every HubSpot round trip for up to the TTL.
+def response_cache_key(prefix):
+    """Cache key for the current request: prefix + hash of its sorted query params."""
+    params = sorted(request.args.items(multi=True))
+    return f"{prefix}:" + hashlib.blake2b(orjson.dumps(params), digest_size=16).hexdigest()
+
+def get_cached_response(cache_key):
+    """Return a ready JSON response from Redis, or None on miss / Redis unavailable."""
+    if not REDIS_ENABLED or not redis_client:
+        return None
+    try:
+        body = redis_client.get(cache_key)
+    except Exception as e:
+        print(f"[RESPONSE CACHE] Redis load failed for {cache_key}: {e}", file=sys.stderr)
+        return None
+    if body:
+        return flask_app.response_class(body, mimetype='application/json')
     return None
 
-def set_cached_result(cache_key, result):
-    """Cache a result with timestamp"""
-    import time
-    _query_cache[cache_key] = (result, time.time())
+def cached_json_response(cache_key, obj, ttl):
+    """Serialize obj once, store the bytes in Redis for ttl seconds, and return the response."""
+    body = orjson.dumps(obj, default=str, option=_ORJSON_OPTIONS)
+    if REDIS_ENABLED and redis_client:
+        try:
+            redis_client.setex(cache_key, ttl, body)
+        except Exception as e:
+            print(f"[RESPONSE CACHE] Redis save failed for {cache_key}: {e}", file=sys.stderr)
+    return flask_app.response_class(body, mimetype='application/json')
 
-# LLM specialty expansion cache — longer TTL since medical knowledge is stable
+def invalidate_cached_responses(*prefixes):
+    """Delete every cached response under the given prefixes (e.g. after a forced refresh)."""
+    if not REDIS_ENABLED or not redis_client:
+        return
+    for prefix in prefixes:
+        try:
+            batch = []
+            for key in redis_client.scan_iter(match=f"{prefix}:*", count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    redis_client.unlink(*batch)
+                    batch = []
+            if batch:
+                redis_client.unlink(*batch)
+        except Exception as e:
+            print(f"[RESPONSE CACHE] Invalidation failed for {prefix}: {e}", file=sys.stderr)
+
+# LLM specialty expansion cache — longer TTL since medical knowledge is stable.
+# Per-worker dict of input -> (result, expires_at), backed by Redis so every
+# worker (and a restarted one) shares each expansion instead of re-asking the LLM
 _specialty_expansion_cache = {}
-_specialty_expansion_ttl = 86400  # 24 hours
+# TTL depends on the outcome: a validated expansion is stable medical knowledge,
+# an empty one may just be the model missing the list, and a failed call should
+# be retried soon
+_specialty_expansion_ttl = 7 * 86400  # 7 days
+_specialty_expansion_empty_ttl = 900  # 15 minutes
+_specialty_expansion_failure_ttl = 300  # retry a failed expansion after 5 minutes
+
+
+def _get_cached_expansion(cache_key):
+    """Cached expansion for a normalized input specialty, or None on miss."""
+    cached = _specialty_expansion_cache.get(cache_key)
+    if cached and time.time() < cached[1]:
+        return cached[0]
+
+    if REDIS_ENABLED and redis_client:
+        try:
+            redis_key = f"spec_exp:{cache_key}"
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.get(redis_key)
+            pipe.ttl(redis_key)
+            raw, ttl = pipe.execute()
+            if raw is not None:
+                result = msgpack.unpackb(raw, raw=False)
+                _specialty_expansion_cache[cache_key] = (result, time.time() + max(ttl, 1))
+                return result
+        except Exception as e:
+            print(f"[EXPANSION CACHE] Redis load failed for {cache_key}: {e}", file=sys.stderr)
+    return None
+
+
+def _set_cached_expansion(cache_key, result, ttl):
+    """Store an expansion for ttl seconds locally and in Redis."""
+    _specialty_expansion_cache[cache_key] = (result, time.time() + ttl)
+    if REDIS_ENABLED and redis_client:
+        try:
+            redis_client.setex(f"spec_exp:{cache_key}", ttl, msgpack.packb(result, use_bin_type=True))
+        except Exception as e:
+            print(f"[EXPANSION CACHE] Redis save failed for {cache_key}: {e}", file=sys.stderr)
 
 # Cache for the full list of distinct Definitive Healthcare specialties
 _definitive_specialties_cache = {
     "specialties": None,
+    "lower_set": frozenset(),  # casefolded specialties, for validating LLM output
+    "expansion_prompt": None,  # LLM system prompt embedding the list
     "timestamp": 0
 }
 _definitive_specialties_ttl = 86400  # 24 hours
+_definitive_specialties_lock = threading.Lock()
 
 # ─── Clay Contact Search Cache ─────────────────────────────────────────────────
 # Stores contacts returned from Clay searches, keyed by the lookalike company's
@@ -181,16 +492,25 @@ def get_company_key(domain):
     return (domain or '').strip()
 
 
+def _clay_redis_key(company_key):
+    """Redis key for a msgpack-encoded Clay search entry."""
+    return f"clay_search:{company_key}:mp"
+
+
 def _save_clay_cache_to_redis(company_key, data):
     """Persist a Clay search cache entry to Redis (if available) with 30-day TTL."""
     if not REDIS_ENABLED or not redis_client:
         return
     try:
-        redis_client.setex(
-            f"clay_search:{company_key}",
-            _clay_search_ttl,
-            json.dumps(data, default=str)
-        )
+        # One round trip: write the msgpack entry and drop any legacy JSON copy
+        with redis_client.pipeline(transaction=False) as pipe:
+            pipe.setex(
+                _clay_redis_key(company_key),
+                _clay_search_ttl,
+                msgpack.packb(data, use_bin_type=True, default=str)
+            )
+            pipe.delete(f"clay_search:{company_key}")
+            pipe.execute()
     except Exception as e:
         print(f"[CLAY CACHE] Redis save failed for {company_key}: {e}", file=sys.stderr)
 
@@ -200,13 +520,23 @@ def _load_clay_cache_from_redis(company_key):
     Load a Clay search cache entry from Redis on in-memory cache miss.
     Handles multi-worker scenarios where worker A wrote the entry but worker B
     needs to read it. Returns the parsed dict or None.
+
+    Entries are stored as msgpack under the ":mp" key; entries written before
+    the msgpack switch are still read from the legacy JSON key.
     """
     if not REDIS_ENABLED or not redis_client:
         return None
     try:
-        raw = redis_client.get(f"clay_search:{company_key}")
-        if raw:
-            data = json.loads(raw)
+        # Fetch both encodings in a single round trip
+        with redis_client.pipeline(transaction=False) as pipe:
+            pipe.get(_clay_redis_key(company_key))
+            pipe.get(f"clay_search:{company_key}")
+            raw_mp, raw_json = pipe.execute()
+        if raw_mp:
+            data = msgpack.unpackb(raw_mp, raw=False)
+        else:
+            data = json.loads(raw_json) if raw_json else None
+        if data:
             # Hydrate in-memory cache so subsequent reads are fast
             _clay_search_cache[company_key] = data
             return data
@@ -228,44 +558,129 @@ def _get_clay_search(company_key):
     return _load_clay_cache_from_redis(company_key)
 
 
+def _update_clay_search(company_key, mutate, max_retries=5):
+    """
+    Read-modify-write a Clay search entry so concurrent callbacks don't drop contacts.
+
+    mutate(entry) receives the current entry (or None) and returns the entry to store,
+    or None to leave it untouched. With Redis the read and write run under WATCH/MULTI
+    and are retried if another worker wrote the key in between; Redis is always read
+    fresh here, since this worker's in-memory copy may be stale. Without Redis the
+    in-memory cache is updated directly. Returns the stored entry (or None).
+    """
+    if not REDIS_ENABLED or not redis_client:
+        entry = mutate(_clay_search_cache.get(company_key))
+        if entry is not None:
+            _clay_search_cache[company_key] = entry
+        return entry
+
+    mp_key = _clay_redis_key(company_key)
+    legacy_key = f"clay_search:{company_key}"
+    try:
+        with redis_client.pipeline() as pipe:
+            for _ in range(max_retries):
+                try:
+                    pipe.watch(mp_key, legacy_key)
+                    raw_mp = pipe.get(mp_key)
+                    raw_json = None if raw_mp else pipe.get(legacy_key)
+                    if raw_mp:
+                        current = msgpack.unpackb(raw_mp, raw=False)
+                    else:
+                        current = json.loads(raw_json) if raw_json else None
+                    entry = mutate(current)
+                    if entry is None:
+                        pipe.unwatch()
+                        return None
+                    pipe.multi()
+                    pipe.setex(mp_key, _clay_search_ttl, msgpack.packb(entry, use_bin_type=True, default=str))
+                    pipe.delete(legacy_key)
+                    pipe.execute()
+                    _clay_search_cache[company_key] = entry
+                    return entry
+                except redis.WatchError:
+                    # Another worker updated the entry between our read and write — re-read and retry
+                    continue
+        print(f"[CLAY CACHE] Gave up merging {company_key} after {max_retries} concurrent writes", file=sys.stderr)
+    except Exception as e:
+        print(f"[CLAY CACHE] Redis merge failed for {company_key}: {e}", file=sys.stderr)
+    # Redis unavailable or contended: keep at least this worker's copy current
+    entry = mutate(_clay_search_cache.get(company_key))
+    if entry is not None:
+        _clay_search_cache[company_key] = entry
+    return entry
+
+
+@lru_cache(maxsize=4096)
+def _phone_digits(phone):
+    """Digits-only phone for dedup; '' if too short to be meaningful."""
+    digits = ''.join(ch for ch in phone if ch.isdigit())
+    return digits if len(digits) >= 7 else ''
+
+
+def _contact_dedup_keys(contact):
+    """
+    Normalize a contact's identifying fields once for deduplication.
+    Returns (email, linkedin, phone, name); missing fields are ''.
+    Phone keeps digits only and is ignored if too short to be meaningful.
+    """
+    email = (contact.get('email') or '').strip().lower()
+    linkedin = (contact.get('linkedin') or '').strip().lower()
+    phone = _phone_digits(str(contact.get('phone') or ''))
+    name = ' '.join((contact.get('name') or '').lower().split())
+    return email, linkedin, phone, name
+
+
 def _deduplicate_contacts(existing_contacts, new_contacts):
     """
-    Merge new contacts into existing list, deduplicating by email or LinkedIn URL.
-    - If a new contact's email OR linkedin matches an existing contact, skip it.
+    Merge new contacts into existing list, deduplicating by email, LinkedIn URL or phone.
+    - If a new contact's email, linkedin OR phone matches an existing contact, skip it.
+    - Contacts with none of those identifiers are matched on normalized name instead.
     - Preserves the earlier first_seen date on existing contacts.
     - Adds first_seen = now for genuinely new contacts.
     Returns the merged list.
     """
-    # Build lookup sets from existing contacts for fast dedup
+    # Hash indexes over normalized keys: each lookup below is O(1)
     seen_emails = set()
     seen_linkedins = set()
+    seen_phones = set()
+    seen_names = set()
+
+    def _index(keys):
+        email, linkedin, phone, name = keys
+        if email:
+            seen_emails.add(email)
+        if linkedin:
+            seen_linkedins.add(linkedin)
+        if phone:
+            seen_phones.add(phone)
+        if name:
+            seen_names.add(name)
+
     for c in existing_contacts:
-        if c.get('email'):
-            seen_emails.add(c['email'].strip().lower())
-        if c.get('linkedin'):
-            seen_linkedins.add(c['linkedin'].strip().lower())
+        _index(_contact_dedup_keys(c))
 
     merged = list(existing_contacts)  # copy
     now = datetime.utcnow().isoformat()
 
     for contact in new_contacts:
-        email = (contact.get('email') or '').strip().lower()
-        linkedin = (contact.get('linkedin') or '').strip().lower()
-
-        # Skip if we already have this contact (by email or linkedin)
-        is_duplicate = False
-        if email and email in seen_emails:
-            is_duplicate = True
-        if linkedin and linkedin in seen_linkedins:
-            is_duplicate = True
+        keys = _contact_dedup_keys(contact)
+        email, linkedin, phone, name = keys
+
+        # Skip if we already have this contact (by email, linkedin or phone)
+        if email or linkedin or phone:
+            is_duplicate = (
+                (email and email in seen_emails) or
+                (linkedin and linkedin in seen_linkedins) or
+                (phone and phone in seen_phones)
+            )
+        else:
+            # No identifiers at all — fall back to the name
+            is_duplicate = bool(name) and name in seen_names
 
         if not is_duplicate:
             contact['first_seen'] = contact.get('first_seen', now)
             merged.append(contact)
-            if email:
-                seen_emails.add(email)
-            if linkedin:
-                seen_linkedins.add(linkedin)
+            _index(keys)
 
     return merged
 
@@ -299,15 +714,17 @@ def has_valid_contact_info(contact, contact_type="physician"):
         )
         return has_direct_email or has_mobile
 
-def score_single_org(args):
-    """
-    Worker function for parallel similarity scoring.
-    Takes tuple of (company_data, org) and returns (org, score, reasons)
-    """
-    company_data, org = args
-    score = calculate_similarity_score(company_data, org)
-    reasons = get_match_reasons(company_data, org, score)
-    return (org, score, reasons)
+# Contact columns (as aliased in the lookalike contact queries) that count as reachable —
+# mirrors the field sets checked by has_valid_contact_info
+_PHYS_CONTACT_COLUMNS = (
+    "phys_direct_email_primary", "phys_direct_email_secondary",
+    "phys_mobile_primary", "phys_mobile_secondary",
+)
+_EXEC_CONTACT_COLUMNS = (
+    "LINKEDIN_PROFILE",
+    "exec_direct_email_primary", "exec_direct_email_secondary",
+    "exec_mobile_primary", "exec_mobile_secondary",
+)
 
 # Function to connect to Databricks
 def get_databricks_connection():
@@ -321,14 +738,168 @@ def get_databricks_connection():
     except Exception as e:
         raise Exception(f"Failed to connect to Databricks: {str(e)}")
 
+
+class DatabricksPool:
+    """
+    Bounded pool of Databricks SQL connections shared by the worker's request threads.
+    Opening a session costs a TLS + Thrift handshake, so up to pool_size idle
+    connections are kept warm. Under load up to max_overflow extra connections
+    are opened and closed on release instead of being kept. A connection that
+    has sat idle longer than ping_after seconds is checked with SELECT 1 before
+    reuse and replaced if the warehouse has dropped the session.
+    """
+
+    def __init__(self, pool_size=5, max_overflow=10, timeout=30, ping_after=300):
+        self._idle = queue.LifoQueue(maxsize=pool_size)
+        self._slots = threading.BoundedSemaphore(pool_size + max_overflow)
+        self._timeout = timeout
+        self._ping_after = ping_after
+
+    @staticmethod
+    def _discard(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _is_alive(conn):
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except Exception as e:
+            print(f"[DATABRICKS POOL] Dropping stale connection: {e}", file=sys.stderr)
+            return False
+
+    def _checkout(self):
+        """An idle connection that still answers, or a fresh one."""
+        while True:
+            try:
+                conn, idle_since = self._idle.get_nowait()
+            except queue.Empty:
+                return get_databricks_connection()
+            if time.time() - idle_since < self._ping_after or self._is_alive(conn):
+                return conn
+            self._discard(conn)
+
+    @contextmanager
+    def acquire(self):
+        """Borrow a connection; it goes back to the pool unless the block raised."""
+        if not self._slots.acquire(timeout=self._timeout):
+            raise Exception("Timed out waiting for a Databricks connection")
+        conn = None
+        try:
+            conn = self._checkout()
+            yield conn
+        except BaseException:
+            # The session may be broken; don't hand it to the next caller
+            if conn is not None:
+                self._discard(conn)
+                conn = None
+            raise
+        finally:
+            if conn is not None:
+                try:
+                    self._idle.put_nowait((conn, time.time()))
+                except queue.Full:
+                    self._discard(conn)
+            self._slots.release()
+
+
+db_pool = DatabricksPool(pool_size=5, max_overflow=10)
+
+def _iter_rows(cursor, batch_size=1000):
+    """Yield rows from the current result set, fetching batch_size at a time instead of fetchall()."""
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            return
+        yield from batch
+
+
+def _fetch_arrow_table(cursor, batch_size=1000, row_filter=None):
+    """
+    Read the current result set as one Arrow table, pulled in batch_size record
+    batches. row_filter, if given, maps a batch to a boolean mask and is applied
+    to each batch as it arrives, so rejected rows never accumulate.
+    Returns None if the cursor has no Arrow fetch support.
+    """
+    fetchmany_arrow = getattr(cursor, 'fetchmany_arrow', None)
+    if fetchmany_arrow is None:
+        return None
+    batches = []
+    while True:
+        batch = fetchmany_arrow(batch_size)
+        if not batch.num_rows:
+            batches.append(batch)  # keeps the schema for an empty result
+            break
+        if row_filter is not None:
+            batch = batch.filter(row_filter(batch))
+        batches.append(batch)
+    return pa.concat_tables(batches)
+
+
+def _fetch_dicts(cursor, batch_size=1000):
+    """
+    Read the current result set as a list of column->value dicts, streaming in batches.
+    Uses the connector's Arrow fetch when available so the row dicts are built in C
+    (Table.to_pylist) instead of one dict(zip(...)) per row in Python.
+    """
+    table = _fetch_arrow_table(cursor, batch_size)
+    if table is not None:
+        return table.to_pylist()
+
+    columns = tuple(desc[0] for desc in cursor.description)
+    return [dict(zip(columns, row)) for row in _iter_rows(cursor, batch_size)]
+
+
+def valid_contact_mask(table, columns):
+    """
+    Vectorized has_valid_contact_info over an Arrow table: for each row, True if
+    at least one of `columns` is non-null and non-blank after trimming.
+    Returns a boolean Arrow array aligned with the table's rows.
+    """
+    masks = []
+    for name in columns:
+        col = pc.utf8_trim_whitespace(pc.cast(table[name], pa.string()))
+        masks.append(pc.fill_null(pc.greater(pc.utf8_length(col), 0), False))
+    return reduce(pc.or_, masks)
+
+
+def _run_lookalike_query(query, params, contact_columns=None):
+    """
+    Run one lookalike query on its own pooled connection, pulling Arrow batches
+    rather than Thrift row tuples. Returns (row dicts, checked). With
+    contact_columns, rows without a usable contact are dropped batch by batch
+    before any dicts are built, and checked is True; it is False when the
+    connector had no Arrow fetch and the caller must check rows itself.
+    """
+    with db_pool.acquire() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query, params)
+            row_filter = None
+            if contact_columns:
+                row_filter = lambda batch: valid_contact_mask(batch, contact_columns)
+            table = _fetch_arrow_table(cursor, batch_size=10000, row_filter=row_filter)
+            if table is None:
+                return _fetch_dicts(cursor, batch_size=10000), False
+            return table.to_pylist(), True
+        finally:
+            cursor.close()
+
 # ============================================
 # HubSpot Property Mappings
 # ============================================
 
-# Properties to fetch from HubSpot
+# Properties to fetch from HubSpot -- exactly the keys read by the /api/deals
+# format loop; HubSpot ships every requested property for every deal, so keep
+# this in step with that loop. (The object id always comes back as deal['id'].)
 DEAL_PROPERTIES = [
     # Identifiers
-    "hs_object_id",
     "dealname",
     
     # Company/Contact associations
@@ -390,17 +961,174 @@ FILTER_PROPERTIES = {
     'product': 'product'
 }
 
-@lru_cache(maxsize=1)
+# ─── Shared HubSpot metadata cache ─────────────────────────────────────────────
+# Pipelines/stages and the specialty property rarely change. Each worker keeps a
+# short-lived in-memory copy (L1); Redis (L2) holds the fetched payload so all
+# workers share one HubSpot call. Publishing on _HS_INVALIDATE_CHANNEL (see
+# invalidate_hubspot_metadata) drops every worker's L1 copy.
+_hubspot_metadata_l1 = {}  # name -> (value, timestamp)
+_hubspot_metadata_l1_ttl = 300  # 5 minutes
+_hubspot_metadata_ttl = 3600  # 1 hour in Redis
+_HS_INVALIDATE_CHANNEL = 'hs:invalidate'
+_hs_listener_pid = None  # pid that started the invalidation listener
+_hs_listener_lock = threading.Lock()
+
+
+def _cached_hubspot_metadata(name, fetch, fallback):
+    """
+    Read-through cache for a HubSpot metadata payload: L1 dict, then Redis, then
+    fetch(). fetch() returns None on failure; failures are not cached and the
+    fallback is returned instead.
+    """
+    _ensure_hubspot_invalidation_listener()
+    cached = _hubspot_metadata_l1.get(name)
+    if cached and time.time() - cached[1] < _hubspot_metadata_l1_ttl:
+        return cached[0]
+
+    value = None
+    if REDIS_ENABLED and redis_client:
+        try:
+            raw = redis_client.get(f"hs:{name}")
+            if raw:
+                value = msgpack.unpackb(raw, raw=False)
+        except Exception as e:
+            print(f"[HUBSPOT CACHE] Redis load failed for {name}: {e}", file=sys.stderr)
+
+    if value is None:
+        value = fetch()
+        if value is None:
+            return fallback()
+        if REDIS_ENABLED and redis_client:
+            try:
+                redis_client.setex(f"hs:{name}", _hubspot_metadata_ttl, msgpack.packb(value, use_bin_type=True))
+            except Exception as e:
+                print(f"[HUBSPOT CACHE] Redis save failed for {name}: {e}", file=sys.stderr)
+
+    _hubspot_metadata_l1[name] = (value, time.time())
+    return value
+
+
+def _clear_hubspot_metadata_l1():
+    _hubspot_metadata_l1.clear()
+    get_specialty_label.cache_clear()
+
+
+def invalidate_hubspot_metadata():
+    """Drop the shared HubSpot metadata so the next read refetches it, on every worker."""
+    _clear_hubspot_metadata_l1()
+    if REDIS_ENABLED and redis_client:
+        try:
+            redis_client.delete('hs:mappings', 'hs:specialty_property')
+            redis_client.publish(_HS_INVALIDATE_CHANNEL, b'1')
+        except Exception as e:
+            print(f"[HUBSPOT CACHE] Invalidation failed: {e}", file=sys.stderr)
+
+
+def _listen_for_hubspot_invalidation():
+    """Background subscriber: clear this worker's L1 when any worker invalidates."""
+    while True:
+        pubsub = None
+        try:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(_HS_INVALIDATE_CHANNEL)
+            # Invalidations published while we were disconnected were missed
+            _clear_hubspot_metadata_l1()
+            for _ in pubsub.listen():
+                _clear_hubspot_metadata_l1()
+        except Exception as e:
+            print(f"[HUBSPOT CACHE] Invalidation listener error: {e}", file=sys.stderr)
+        finally:
+            if pubsub is not None:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+        time.sleep(5)
+
+
+def _ensure_hubspot_invalidation_listener():
+    """
+    Start the invalidation subscriber on first use in this process rather than at
+    import, so it runs in each gunicorn worker (not a pre-fork parent) and nothing
+    connects to Redis just because the module was imported.
+    """
+    global _hs_listener_pid
+    if not REDIS_ENABLED or not redis_client or _hs_listener_pid == os.getpid():
+        return
+    with _hs_listener_lock:
+        if _hs_listener_pid == os.getpid():
+            return
+        _hs_listener_pid = os.getpid()
+        threading.Thread(target=_listen_for_hubspot_invalidation, name='hs-invalidate', daemon=True).start()
+
+
+def _empty_hubspot_mappings():
+    return {'stages': {}, 'pipelines': {}, 'stage_list': []}
+
+
 def get_hubspot_mappings():
-    """Fetch deal stages and pipelines"""
+    """Fetch deal stages and pipelines (shared cache, see _cached_hubspot_metadata)"""
+    return _cached_hubspot_metadata('mappings', _fetch_hubspot_mappings, _empty_hubspot_mappings)
+
+
+# Filter dropdowns only offer these pipelines (and their stages)
+ALLOWED_PIPELINES = ('Sales - Global', 'Expansion')
+
+# (mappings, options) for the last mappings payload seen; the mappings object is
+# replaced whenever the metadata cache refreshes, so identity is the cache key
+_pipeline_stage_options = (None, None)
+
+
+def get_pipeline_stage_options(mappings):
+    """
+    Pipeline and deal stage dropdown options for the allowed pipelines ->
+    (pipelines sorted by name, formatted stages). Rebuilt only when a new
+    mappings payload arrives, not on every /api/filters request.
+    """
+    global _pipeline_stage_options
+    cached_mappings, options = _pipeline_stage_options
+    if cached_mappings is mappings:
+        return options
+
+    pipeline_options = []
+    seen_pipeline_ids = set()
+    for key, value in mappings['pipelines'].items():
+        if isinstance(key, str) and key not in seen_pipeline_ids:
+            pipeline_options.append({
+                'id': mappings['pipelines'].get(key),
+                'name': key
+            })
+            seen_pipeline_ids.add(mappings['pipelines'].get(key))
+
+    pipeline_options = sorted(
+        (p for p in pipeline_options if p['name'] in ALLOWED_PIPELINES),
+        key=lambda x: x['name']
+    )
+
+    # DEAL STAGES: Only show stages from Sales - Global and Expansion pipelines
+    deal_stage_options = [
+        {
+            'id': stage['id'],
+            'label': stage['label'],
+            'pipeline': stage['pipeline'],
+            'pipeline_id': stage['pipeline_id']
+        }
+        for stage in mappings['stage_list']
+        if stage['pipeline'] in ALLOWED_PIPELINES
+    ]
+
+    options = (pipeline_options, deal_stage_options)
+    _pipeline_stage_options = (mappings, options)
+    return options
+
+
+def _fetch_hubspot_mappings():
+    """Fetch deal stages and pipelines from HubSpot; None on failure"""
     try:
-        response = requests.get(
-            'https://api.hubapi.com/crm/v3/pipelines/deals',
-            headers={'Authorization': f'Bearer {HUBSPOT_API_KEY}'}
-        )
+        response = hubspot_session.get('https://api.hubapi.com/crm/v3/pipelines/deals')
         
         if response.status_code != 200:
-            return {'stages': {}, 'pipelines': {}, 'stage_list': []}
+            return None
         
         pipelines = response.json()['results']
         
@@ -431,71 +1159,123 @@ def get_hubspot_mappings():
         }
     except Exception as e:
         print(f"Error fetching HubSpot mappings: {e}")
-        return {'stages': {}, 'pipelines': {}, 'stage_list': []}
+        return None
+
+
+# Owner id -> display name, primed in bulk from the paginated /owners list
+# (one call per 100 owners) instead of one /owners/{id} call per owner
+_owner_names = {}
+_owner_names_lock = threading.Lock()
+_owner_names_loaded_at = 0
+_owner_names_ttl = 900  # 15 minutes
+
+
+def _format_owner_name(owner):
+    return f"{owner.get('firstName', '')} {owner.get('lastName', '')}".strip()
+
+
+def prime_owner_names():
+    """Load all HubSpot owners into _owner_names; refreshes at most every 15 minutes."""
+    global _owner_names_loaded_at
+    with _owner_names_lock:
+        if time.time() - _owner_names_loaded_at < _owner_names_ttl:
+            return
+        names = {}
+        params = {'limit': 100}
+        try:
+            while True:
+                response = hubspot_session.get('https://api.hubapi.com/crm/v3/owners', params=params)
+                if response.status_code != 200:
+                    print(f"[OWNERS] Bulk owner fetch failed: HTTP {response.status_code}", file=sys.stderr)
+                    break
+                data = response.json()
+                for owner in data.get('results', []):
+                    names[str(owner['id'])] = _format_owner_name(owner)
+                after = data.get('paging', {}).get('next', {}).get('after')
+                if not after:
+                    break
+                params['after'] = after
+        except Exception as e:
+            print(f"[OWNERS] Bulk owner fetch failed: {e}", file=sys.stderr)
+        _owner_names.update(names)
+        # Even on failure, wait for the next refresh window; misses fall back to
+        # single-owner lookups below
+        _owner_names_loaded_at = time.time()
 
 
-@lru_cache(maxsize=100)
 def get_owner_name(owner_id):
     if not owner_id:
         return None
-    
+
+    prime_owner_names()
+    key = str(owner_id)
+    name = _owner_names.get(key)
+    if name is not None:
+        return name
+
+    # Not in the owner list (e.g. deactivated owner) — look it up individually
+    name = owner_id
     try:
-        
-        response = requests.get(
-            f'https://api.hubapi.com/crm/v3/owners/{owner_id}',
-            headers={'Authorization': f'Bearer {HUBSPOT_API_KEY}'}
-        )
-        
-        
+        response = hubspot_session.get(f'https://api.hubapi.com/crm/v3/owners/{owner_id}')
         if response.status_code == 200:
-            owner = response.json()
-            name = f"{owner.get('firstName', '')} {owner.get('lastName', '')}".strip()
-            return name
+            name = _format_owner_name(response.json())
     except Exception as e:
         print(f"DEBUG: Error = {e}", file=sys.stderr)
-    
-    return owner_id
 
-@lru_cache(maxsize=1)
+    _owner_names[key] = name
+    return name
+
 def get_specialty_property_info():
     """
-    Fetch specialty property metadata from HubSpot.
+    Fetch specialty property metadata from HubSpot (shared cache).
     Returns: dict with is_enumeration flag and value->label mapping
     """
+    return _cached_hubspot_metadata(
+        'specialty_property',
+        _fetch_specialty_property_info,
+        lambda: {'is_enumeration': False, 'mapping': {}},
+    )
+
+
+def _fetch_specialty_property_info():
+    """Fetch the specialty property from HubSpot; None on failure"""
     try:
-        response = requests.get(
-            'https://api.hubapi.com/crm/v3/properties/deals',
-            headers={'Authorization': f'Bearer {HUBSPOT_API_KEY}'}
-        )
+        response = hubspot_session.get('https://api.hubapi.com/crm/v3/properties/deals')
         
-        if response.status_code == 200:
-            props_data = response.json()
-            
-            # Find ALL properties named 'specialty_mcp_use'
-            specialty_props = [
-                p for p in props_data.get('results', []) 
-                if p['name'] == 'specialty_mcp_use'
-            ]
-            
+        if response.status_code != 200:
+            return None
 
-            # Prefer enumeration type if multiple exist
-            for prop in specialty_props:
-                if prop.get('type') == 'string':
-                    # Build mapping: internal_value -> display_label
-                    mapping = {
-                        option['value']: option['label'] 
-                        for option in prop.get('options', [])
-                    }
-                    return {
-                        'is_enumeration': True,
-                        'mapping': mapping
-                    }
+        props_data = response.json()
+        
+        # Find ALL properties named 'specialty_mcp_use'
+        specialty_props = [
+            p for p in props_data.get('results', []) 
+            if p['name'] == 'specialty_mcp_use'
+        ]
+        
+
+        # Prefer enumeration type if multiple exist
+        for prop in specialty_props:
+            if prop.get('type') == 'string':
+                # Build mapping: internal_value -> display_label
+                mapping = {
+                    option['value']: option['label'] 
+                    for option in prop.get('options', [])
+                }
+                return {
+                    'is_enumeration': True,
+                    'mapping': mapping
+                }
                            
     except Exception as e:
         print(f"Error fetching specialty property: {e}", file=sys.stderr)
+        return None
     
     return {'is_enumeration': False, 'mapping': {}}
 
+_SPECIALTY_SPLIT = re.compile(r'\s*;\s*').split
+
+@lru_cache(maxsize=4096)
 def get_specialty_label(internal_value):
     """
     Return specialty value as-is from specialty_mcp_use field.
@@ -507,31 +1287,232 @@ def get_specialty_label(internal_value):
     prop_info = get_specialty_property_info()
     mapping = prop_info['mapping']
 
+    # Internal value -> label; labels and unknown values are kept as-is
+    value_str = str(internal_value)
+
     # Handle multi-select
-    if ';' in str(internal_value):
-        values = [v.strip() for v in str(internal_value).split(';')]
-        # If value is already a label (not in mapping keys), keep as-is
-        labels = []
-        for v in values:
-            if v in mapping:
-                labels.append(mapping[v])  # Map internal -> label
-            elif v in mapping.values():
-                labels.append(v)  # Already a label, keep it
-            else:
-                labels.append(v)  # Unknown, keep as-is
-        return '; '.join(labels)
-    
+    if ';' in value_str:
+        return '; '.join(mapping.get(v, v) for v in _SPECIALTY_SPLIT(value_str.strip()))
+
     # Single value
-    value_str = str(internal_value)
-    if value_str in mapping:
-        return mapping[value_str]  # Internal value -> label
-    elif value_str in mapping.values():
-        return value_str  # Already a label
-    else:
-        return value_str  # Unknown, return as-is
+    return mapping.get(value_str, value_str)
     
 
 
+# HubSpot metadata lookups are independent blocking HTTP calls; run them on a small
+# shared pool so a cold request pays one round trip instead of one per owner.
+_hubspot_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='hubspot')
+
+
+def batch_get_owner_names(owner_ids):
+    """
+    Resolve a set of owner ids to names in one go -> {owner_id: name}.
+    Served from the bulk-loaded owner list; only ids missing from it (rare,
+    e.g. deactivated owners) fall back to single-owner lookups.
+    """
+    prime_owner_names()
+    return {owner_id: get_owner_name(owner_id) for owner_id in owner_ids if owner_id}
+
+
+def _fetch_company_lc_batch(batch_chunk):
+    """Batch-read LC City / LC US State / domain for up to 100 companies -> {company_id: {...}}."""
+    lc_map = {}
+    try:
+        comp_resp = hubspot_session.post(
+            'https://api.hubapi.com/crm/v3/objects/companies/batch/read',
+            json={
+                "inputs": batch_chunk,
+                "properties": ["lc_city", "lc_us_state", "domain"]
+            }
+        )
+        if comp_resp.status_code == 200:
+            for comp in comp_resp.json().get('results', []):
+                comp_props = comp.get('properties', {})
+                lc_map[comp['id']] = {
+                    'lc_city': comp_props.get('lc_city') or None,
+                    'lc_us_state': comp_props.get('lc_us_state') or None,
+                    'domain': comp_props.get('domain') or None
+                }
+    except Exception as e:
+        print(f"DEBUG: Error fetching company LC data: {e}", file=sys.stderr)
+    return lc_map
+
+
+# Shared read-only stand-in for deals with no associated company LC data
+_NO_LC_DATA = {}
+
+
+def _hs_int(value):
+    """HubSpot number property (a string like "12.0", or blank/None) -> int."""
+    return int(float(value)) if value else 0
+
+
+def _hs_float(value):
+    """HubSpot number property -> float, 0.0 when blank/None."""
+    return float(value) if value else 0.0
+
+
+# Dashboard query params that map straight onto a HubSpot search filter:
+# (query param, deal property, operator, request.args type)
+DEAL_ATTRIBUTE_FILTER_SPEC = (
+    ('deal_stage', 'dealstage', 'EQ', None),
+    ('country', 'country', 'EQ', None),
+    ('billing_state', 'billing_state', 'EQ', None),
+    ('billing_city', 'billing_city', 'CONTAINS_TOKEN', None),
+    ('product', 'product', 'EQ', None),
+    ('specialty_mcp_use', 'specialty_mcp_use', 'CONTAINS_TOKEN', None),
+)
+
+# /api/deals also takes minimums, applied by HubSpot so non-matching deals
+# never come back
+DEAL_FILTER_SPEC = DEAL_ATTRIBUTE_FILTER_SPEC + (
+    ('min_seats', 'seats_subscribed', 'GTE', int),
+    ('min_tso', 'total_serviceable_opportunity', 'GTE', int),
+)
+
+# Pipelines searched when no pipeline is selected: one filter group per pipeline
+DEFAULT_PIPELINE_FILTERS = (
+    {"propertyName": "pipeline", "operator": "EQ", "value": "74974043"},   # Sales - Global
+    {"propertyName": "pipeline", "operator": "EQ", "value": "779936085"},  # Expansion
+)
+
+
+def build_deal_filter_groups(args, close_date_filter, resolve_pipeline, filter_spec=DEAL_FILTER_SPEC):
+    """
+    HubSpot search filterGroups for the dashboard's deal filters in args: one
+    group per pipeline searched (OR logic), each holding the close date filter
+    and every filter_spec param that has a value (AND logic). A pipeline
+    selected by name is turned into its id with resolve_pipeline(name).
+    """
+    # Add all other filters to every group (so they apply with AND logic)
+    additional_filters = []
+    for param, property_name, operator, parse in filter_spec:
+        value = args.get(param, type=parse)
+        if value:
+            additional_filters.append({
+                "propertyName": property_name,
+                "operator": operator,
+                "value": str(value)
+            })
+
+    # If user selected a specific pipeline in dropdown, only use that one;
+    # otherwise one group each for Sales - Global OR Expansion
+    pipeline = args.get('pipeline')
+    if pipeline:
+        pipeline_id = pipeline if pipeline.isdigit() else resolve_pipeline(pipeline)
+        pipeline_filters = ({"propertyName": "pipeline", "operator": "EQ", "value": pipeline_id},)
+    else:
+        pipeline_filters = DEFAULT_PIPELINE_FILTERS
+
+    return [
+        {"filters": [close_date_filter, pipeline_filter] + additional_filters}
+        for pipeline_filter in pipeline_filters
+    ]
+
+# HubSpot's search endpoint returns at most 100 results per page
+DEALS_PAGE_SIZE = 100
+DEALS_MAX_RESULTS = 1000
+
+
+def _search_deals_page(filter_groups, limit, after=None):
+    """POST one page of the deals search; returns the raw response."""
+    payload = {
+        "filterGroups": filter_groups,
+        "properties": DEAL_PROPERTIES,
+        "sorts": [{"propertyName": "closedate", "direction": "DESCENDING"}],
+        "limit": limit
+    }
+    if after:
+        payload["after"] = after
+    return hubspot_session.post('https://api.hubapi.com/crm/v3/objects/deals/search', json=payload)
+
+
+def _iter_deal_pages(first_page, filter_groups, max_deals):
+    """
+    Yield pages of raw deals, starting from an already-fetched first page and
+    following paging.next.after until max_deals have been returned. Each next
+    page is requested on the HubSpot pool while the caller formats the current
+    one. A failed follow-up page ends the listing early rather than failing it.
+    """
+    page = first_page
+    remaining = max_deals
+    while True:
+        results = page.get('results', [])
+        remaining -= len(results)
+        after = page.get('paging', {}).get('next', {}).get('after')
+        next_future = None
+        if results and after and remaining > 0:
+            next_future = _hubspot_executor.submit(
+                _search_deals_page, filter_groups, min(DEALS_PAGE_SIZE, remaining), after)
+        yield results
+        if next_future is None:
+            return
+        try:
+            response = next_future.result()
+            if response.status_code != 200:
+                print(f"[DEALS] Stopping pagination, HubSpot returned {response.status_code}: {response.text}", file=sys.stderr)
+                return
+            page = response.json()
+        except Exception as e:
+            print(f"[DEALS] Stopping pagination: {e}", file=sys.stderr)
+            return
+
+
+def _needs_company_location(props):
+    """A deal falls back to its company's LC City / LC US State when either billing field is blank."""
+    return not (props.get('billing_city') and props.get('billing_state'))
+
+
+def _company_batches(company_ids):
+    """Split company ids into batch-read inputs; HubSpot batch read supports up to 100 at a time."""
+    batch_inputs = [{"id": cid} for cid in company_ids]
+    return [batch_inputs[i:i+100] for i in range(0, len(batch_inputs), 100)]
+
+
+def _fetch_company_lc_map(company_ids):
+    """LC data for a set of company ids -> {company_id: {...}}."""
+    # Batches are independent, so more than one is fetched concurrently on the
+    # shared HubSpot pool
+    batch_chunks = _company_batches(company_ids)
+    if len(batch_chunks) == 1:
+        chunk_maps = [_fetch_company_lc_batch(batch_chunks[0])]
+    else:
+        chunk_maps = _hubspot_executor.map(_fetch_company_lc_batch, batch_chunks)
+    company_lc_map = {}
+    for chunk_map in chunk_maps:
+        company_lc_map.update(chunk_map)
+    return company_lc_map
+
+
+# Company ids seen by the last /api/deals call with the same query, so a repeat
+# of that query can start reading companies before its deals search returns
+_DEAL_COMPANY_IDS_TTL = 86400  # 1 day
+
+
+def _predicted_company_ids(key):
+    if not REDIS_ENABLED or not redis_client:
+        return set()
+    try:
+        return {cid.decode() for cid in redis_client.smembers(key)}
+    except Exception as e:
+        print(f"[DEALS] Company id prediction load failed: {e}", file=sys.stderr)
+        return set()
+
+
+def _remember_company_ids(key, company_ids):
+    if not REDIS_ENABLED or not redis_client:
+        return
+    try:
+        pipe = redis_client.pipeline()
+        pipe.delete(key)
+        if company_ids:
+            pipe.sadd(key, *company_ids)
+            pipe.expire(key, _DEAL_COMPANY_IDS_TTL)
+        pipe.execute()
+    except Exception as e:
+        print(f"[DEALS] Company id prediction save failed: {e}", file=sys.stderr)
+
+
 # ========================================
 # NEW: Get Deals (with ALL stages support)
 # ========================================
@@ -548,270 +1529,185 @@ def get_deals():
     - deal_stage
     - specialty_mcp_use, country, billing_state, billing_city
     - min_seats, min_tso, product, pipeline
+    - max_deals (default: 100, up to 1000; fetched 100 per HubSpot page)
+    - include_domain (default: false) -- look up company_domain for every deal;
+      otherwise company data (lc_city, lc_us_state, company_domain) is only
+      read for deals missing billing_city or billing_state
     """
 
-    # Parse filters
-    days_back = request.args.get('days_back', 14, type=int)
-    deal_stage = request.args.get('deal_stage')
-    specialty = request.args.get('specialty_mcp_use')
-    country = request.args.get('country')
-    billing_state = request.args.get('billing_state')
-    billing_city = request.args.get('billing_city')
-    min_seats = request.args.get('min_seats', type=int)
-    min_tso = request.args.get('min_tso', type=int)
-    product = request.args.get('product')
-    pipeline = request.args.get('pipeline')
+    cache_key = response_cache_key('deals')
+    cached = get_cached_response(cache_key)
+    if cached is not None:
+        return cached
 
-    # Get mappings
-    mappings = get_hubspot_mappings()
+    # Parse filters (the rest are read by build_deal_filter_groups)
+    days_back = request.args.get('days_back', 14, type=int)
+    max_deals = max(1, min(request.args.get('max_deals', DEALS_PAGE_SIZE, type=int), DEALS_MAX_RESULTS))
+    include_domain = request.args.get('include_domain', '').lower() in ('1', 'true', 'yes')
+
+    # Start the pipeline/stage mappings and owner list fetches now so their round
+    # trips overlap the deals search instead of running before/after it
+    mappings_future = _hubspot_executor.submit(get_hubspot_mappings)
+    _hubspot_executor.submit(prime_owner_names)
+
+    # Speculatively read the companies this query returned last time, in
+    # parallel with the search; any the deals don't cover are fetched after
+    company_ids_key = response_cache_key('deal_cids')
+    predicted_ids = _predicted_company_ids(company_ids_key)
+    predicted_futures = [
+        _hubspot_executor.submit(_fetch_company_lc_batch, chunk)
+        for chunk in _company_batches(predicted_ids)
+    ]
 
     # Build HubSpot filters
     cutoff_date_start = int((datetime.now() - timedelta(days=days_back)).timestamp() * 1000)
     cutoff_date_end = int(datetime.now().timestamp() * 1000)
+    close_date_filter = {
+        "propertyName": "closedate",
+        "operator": "BETWEEN",
+        "value": cutoff_date_start,
+        "highValue": cutoff_date_end
+    }
+
+    filter_groups = build_deal_filter_groups(
+        request.args, close_date_filter,
+        lambda name: mappings_future.result()['pipelines'].get(name, name)
+    )
     
-    # Create filter groups for Sales - Global OR Expansion (OR logic)
-    filter_groups = []
-    
-    # Filter group 1: Sales - Global + all other filters
-    filters_1 = [
-        {
-            "propertyName": "closedate",
-            "operator": "BETWEEN",
-            "value": cutoff_date_start,
-            "highValue": cutoff_date_end
-        },
-        {
-            "propertyName": "pipeline",
-            "operator": "EQ",
-            "value": "74974043"  # Sales - Global
-        }
-    ]
-    
-    # Filter group 2: Expansion + all other filters
-    filters_2 = [
-        {
-            "propertyName": "closedate",
-            "operator": "BETWEEN",
-            "value": cutoff_date_start,
-            "highValue": cutoff_date_end
-        },
-        {
-            "propertyName": "pipeline",
-            "operator": "EQ",
-            "value": "779936085"  # Expansion
-        }
-    ]
-    
-    # Add all other filters to BOTH groups (so they apply with AND logic)
-    additional_filters = []
-    
-    if deal_stage:
-        additional_filters.append({
-            "propertyName": "dealstage",
-            "operator": "EQ",
-            "value": deal_stage
-        })
-    
-    if country:
-        additional_filters.append({
-            "propertyName": "country",
-            "operator": "EQ",
-            "value": country
-        })
-    
-    if billing_state:
-        additional_filters.append({
-            "propertyName": "billing_state",
-            "operator": "EQ",
-            "value": billing_state
-        })
-    
-    if billing_city:
-        additional_filters.append({
-            "propertyName": "billing_city",
-            "operator": "CONTAINS_TOKEN",
-            "value": billing_city
-        })
-    
-    if product:
-        additional_filters.append({
-            "propertyName": "product",
-            "operator": "EQ",
-            "value": product
-        })
-    
-    if specialty:
-        additional_filters.append({
-            "propertyName": "specialty_mcp_use",
-            "operator": "CONTAINS_TOKEN",
-            "value": specialty
-        })
-    
-    # If user selected a specific pipeline in dropdown, only use that one
-    if pipeline:
-        if pipeline.isdigit():
-            pipeline_id = pipeline
-        else:
-            pipeline_id = mappings['pipelines'].get(pipeline, pipeline)
-        
-        # Override - use only the selected pipeline
-        filters_1 = [
-            {
-                "propertyName": "closedate",
-                "operator": "BETWEEN",
-                "value": cutoff_date_start,
-                "highValue": cutoff_date_end
-            },
-            {
-                "propertyName": "pipeline",
-                "operator": "EQ",
-                "value": pipeline_id
-            }
-        ]
-        filters_1.extend(additional_filters)
-        filter_groups = [{"filters": filters_1}]
-    else:
-        # Use both Sales - Global and Expansion
-        filters_1.extend(additional_filters)
-        filters_2.extend(additional_filters)
-        filter_groups = [
-            {"filters": filters_1},
-            {"filters": filters_2}
-        ]
-    
-    # Query HubSpot
+    # Query HubSpot (first page here so a failed search still reports its details)
     try:
-        response = requests.post(
-            'https://api.hubapi.com/crm/v3/objects/deals/search',
-            headers={
-                'Authorization': f'Bearer {HUBSPOT_API_KEY}',
-                'Content-Type': 'application/json'
-            },
-            json={
-                "filterGroups": filter_groups,
-                "properties": DEAL_PROPERTIES,
-                "sorts": [{"propertyName": "closedate", "direction": "DESCENDING"}],
-                "limit": 100
-            }
-        )
+        response = _search_deals_page(filter_groups, min(DEALS_PAGE_SIZE, max_deals))
         
         if response.status_code != 200:
-            return jsonify({'error': 'Failed to fetch deals from HubSpot', 'details': response.text}), 500
+            return ojsonify({'error': 'Failed to fetch deals from HubSpot', 'details': response.text}), 500
         
-        deals_raw = response.json().get('results', [])
+        first_page = response.json()
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
-    
-    # Batch-fetch associated company LC City / LC US State for deals missing billing location
-    company_ids = set()
-    for deal in deals_raw:
-        cid = deal['properties'].get('associated_company_id')
-        if cid:
-            company_ids.add(str(cid))
-
-    company_lc_map = {}  # company_id -> { lc_city, lc_us_state }
-    if company_ids:
-        try:
-            batch_inputs = [{"id": cid} for cid in company_ids]
-            # HubSpot batch read supports up to 100 at a time
-            for i in range(0, len(batch_inputs), 100):
-                batch_chunk = batch_inputs[i:i+100]
-                comp_resp = requests.post(
-                    'https://api.hubapi.com/crm/v3/objects/companies/batch/read',
-                    headers={
-                        'Authorization': f'Bearer {HUBSPOT_API_KEY}',
-                        'Content-Type': 'application/json'
-                    },
-                    json={
-                        "inputs": batch_chunk,
-                        "properties": ["lc_city", "lc_us_state", "domain"]
-                    }
-                )
-                if comp_resp.status_code == 200:
-                    for comp in comp_resp.json().get('results', []):
-                        comp_props = comp.get('properties', {})
-                        company_lc_map[str(comp['id'])] = {
-                            'lc_city': comp_props.get('lc_city') or None,
-                            'lc_us_state': comp_props.get('lc_us_state') or None,
-                            'domain': comp_props.get('domain') or None
-                        }
-        except Exception as e:
-            print(f"DEBUG: Error fetching company LC data: {e}", file=sys.stderr)
+        return ojsonify({'error': str(e)}), 500
 
-    # Format deals
+    mappings = None
+    portal_id = os.getenv('HUBSPOT_PORTAL_ID')
+    company_lc_map = {}  # company_id -> { lc_city, lc_us_state, domain }
+    fetched_company_ids = set()
+    seen_company_ids = set()
     deals = []
-    for deal in deals_raw:
-        props = deal['properties']
-
-        # Parse numeric values
-        seats = int(float(props.get('seats_subscribed') or 0))
-        tso = int(float(props.get('total_serviceable_opportunity') or 0))
-        comms_seats = int(float(props.get('comms_seats') or 0))
-        evidence_seats = int(float(props.get('evidence_seats') or 0))
-        amount = float(props.get('amount_in_home_currency') or 0)
-
-        # Apply client-side filters
-        if min_seats and seats < min_seats:
-            continue
-        if min_tso and tso < min_tso:
-            continue
-
-        # Get owner name
-        owner_id = props.get('hubspot_owner_id')
-        owner_name = get_owner_name(owner_id) if owner_id else None
-
-        # Get pipeline/stage names
-        pipeline_id = props.get('pipeline')
-        pipeline_name = mappings['pipelines'].get(pipeline_id, pipeline_id)
-        dealstage_id = props.get('dealstage')
-        dealstage_name = mappings['stages'].get(dealstage_id, dealstage_id)
-
-        # Get LC City / LC US State from associated company (fallback for billing location)
-        company_id = props.get('associated_company_id')
-        lc_data = company_lc_map.get(str(company_id), {}) if company_id else {}
-
-        deals.append({
-            'deal_id': deal['id'],
-            'deal_name': props.get('dealname'),
-            'deal_url': f"https://app.hubspot.com/contacts/{os.getenv('HUBSPOT_PORTAL_ID')}/deal/{deal['id']}",
-            'associated_company_id': props.get('associated_company_id'),
-            'associated_company_name': props.get('associated_company_name'),
-            'associated_contact_email': props.get('associated_contact_email'),
-            'associated_contact_id': props.get('associated_contact_id'),
-            'deal_segment': props.get('deal_segment'),
-            'deal_category': props.get('deal_category'),
-            'deal_type': props.get('deal_type__new'),
-            'owner_id': owner_id,
-            'owner_name': owner_name,
-            'pipeline_id': pipeline_id,
-            'pipeline_name': pipeline_name,
-            'dealstage_id': dealstage_id,
-            'dealstage_name': dealstage_name,
-            'close_date': props.get('closedate'),
-            'create_date': props.get('createdate'),
-            'amount': amount,
-            'country': props.get('country'),
-            'billing_city': props.get('billing_city'),
-            'billing_state': props.get('billing_state'),
-            'billing_zip': props.get('billing_zip'),
-            'lc_city': lc_data.get('lc_city'),
-            'lc_us_state': lc_data.get('lc_us_state'),
-            'company_domain': lc_data.get('domain'),
-            'product': props.get('product'),
-            'ehr': props.get('ehr'),
-            'seats': seats,
-            'comms_seats': comms_seats,
-            'evidence_seats': evidence_seats,
-            'tso': tso,
-            'specialty_mcp_use': props.get('specialty_mcp_use'),
-            'is_closed_won': props.get('hs_is_closed_won') == 'true',
-            'is_closed_lost': props.get('hs_is_closed_lost') == 'true',
-            'is_deal_closed': props.get('is_deal_closed') == 'true',
-            'lead_source': props.get('lead_source')
-        })
+    # Each page is enriched and formatted as it arrives, while the next page is
+    # already in flight; raw pages are dropped once formatted
+    for deals_raw in _iter_deal_pages(first_page, filter_groups, max_deals):
+        # Map every deal owner to a name in one batch while the company lookup below runs
+        owner_ids = {deal['properties'].get('hubspot_owner_id') for deal in deals_raw}
+        owner_names_future = _hubspot_executor.submit(batch_get_owner_names, owner_ids)
+
+        # Batch-fetch associated company LC City / LC US State for deals missing billing location
+        # (every deal's company when include_domain is set). HubSpot returns ids and
+        # property values as strings, so deal property ids and batch-read ids key
+        # the same map without casting
+        company_ids = {
+            deal['properties'].get('associated_company_id')
+            for deal in deals_raw
+            if include_domain or _needs_company_location(deal['properties'])
+        }
+        company_ids.discard(None)
+        company_ids.discard('')
+
+        seen_company_ids |= company_ids
+
+        if predicted_futures:
+            for future in predicted_futures:
+                company_lc_map.update(future.result())
+            fetched_company_ids |= predicted_ids
+            predicted_futures = None
+        missing_company_ids = company_ids - fetched_company_ids
+        if missing_company_ids:
+            company_lc_map.update(_fetch_company_lc_map(missing_company_ids))
+            fetched_company_ids |= missing_company_ids
+
+        owner_name_map = owner_names_future.result()
+        if mappings is None:
+            mappings = mappings_future.result()
+        pipeline_names = mappings['pipelines']
+        stage_names = mappings['stages']
+        lc_get = company_lc_map.get
+
+        # Format deals. The output has a fixed shape, so everything the loop calls
+        # per field (property getter, parsers, append) is bound to a local first
+        to_int, to_float = _hs_int, _hs_float
+        append = deals.append
+        for deal in deals_raw:
+            get = deal['properties'].get
+
+            # Parse numeric values
+            seats = to_int(get('seats_subscribed'))
+            tso = to_int(get('total_serviceable_opportunity'))
+            comms_seats = to_int(get('comms_seats'))
+            evidence_seats = to_int(get('evidence_seats'))
+            amount = to_float(get('amount_in_home_currency'))
+
+            # Get owner name
+            owner_id = get('hubspot_owner_id')
+            owner_name = owner_name_map.get(owner_id)
+
+            # Get pipeline/stage names
+            pipeline_id = get('pipeline')
+            pipeline_name = pipeline_names.get(pipeline_id, pipeline_id)
+            dealstage_id = get('dealstage')
+            dealstage_name = stage_names.get(dealstage_id, dealstage_id)
+
+            # Get LC City / LC US State from associated company (fallback for billing location)
+            company_id = get('associated_company_id')
+            if include_domain or _needs_company_location(deal['properties']):
+                lc_data = lc_get(company_id, _NO_LC_DATA)
+            else:
+                lc_data = _NO_LC_DATA
+
+            deal_id = deal['id']
+            append({
+                'deal_id': deal_id,
+                'deal_name': get('dealname'),
+                'deal_url': f"https://app.hubspot.com/contacts/{portal_id}/deal/{deal_id}",
+                'associated_company_id': company_id,
+                'associated_company_name': get('associated_company_name'),
+                'associated_contact_email': get('associated_contact_email'),
+                'associated_contact_id': get('associated_contact_id'),
+                'deal_segment': get('deal_segment'),
+                'deal_category': get('deal_category'),
+                'deal_type': get('deal_type__new'),
+                'owner_id': owner_id,
+                'owner_name': owner_name,
+                'pipeline_id': pipeline_id,
+                'pipeline_name': pipeline_name,
+                'dealstage_id': dealstage_id,
+                'dealstage_name': dealstage_name,
+                'close_date': get('closedate'),
+                'create_date': get('createdate'),
+                'amount': amount,
+                'country': get('country'),
+                'billing_city': get('billing_city'),
+                'billing_state': get('billing_state'),
+                'billing_zip': get('billing_zip'),
+                'lc_city': lc_data.get('lc_city'),
+                'lc_us_state': lc_data.get('lc_us_state'),
+                'company_domain': lc_data.get('domain'),
+                'product': get('product'),
+                'ehr': get('ehr'),
+                'seats': seats,
+                'comms_seats': comms_seats,
+                'evidence_seats': evidence_seats,
+                'tso': tso,
+                'specialty_mcp_use': get('specialty_mcp_use'),
+                'is_closed_won': get('hs_is_closed_won') == 'true',
+                'is_closed_lost': get('hs_is_closed_lost') == 'true',
+                'is_deal_closed': get('is_deal_closed') == 'true',
+                'lead_source': get('lead_source')
+            })
     
-    return jsonify(deals)
+    if seen_company_ids != predicted_ids:
+        _remember_company_ids(company_ids_key, seen_company_ids)
+
+    if REDIS_ENABLED:
+        return cached_json_response(cache_key, deals, ttl=60)
+    return ojsonify_list(deals)
 
 #@flask_app.route('/api/deals/raw', methods=['GET'])
 # def get_deals_raw():
@@ -959,144 +1855,50 @@ def get_deals():
 @require_auth
 def get_filter_options():
     """Get correlated filter values based on current filters"""
+
+    cache_key = response_cache_key('filters')
+    cached = get_cached_response(cache_key)
+    if cached is not None:
+        return cached
     
     # Get ALL pipelines and stages
     mappings = get_hubspot_mappings()
 
-    # Get all filter params
+    # Get filter params (the rest are read by build_deal_filter_groups)
     days_back = request.args.get('days_back', 14, type=int)
-    deal_stage = request.args.get('deal_stage')
-    specialty = request.args.get('specialty_mcp_use')
-    country = request.args.get('country')
-    billing_state = request.args.get('billing_state')
-    billing_city = request.args.get('billing_city')
-    product = request.args.get('product')
-    pipeline = request.args.get('pipeline')
     
     try:
         cutoff = int((datetime.now() - timedelta(days=days_back)).timestamp() * 1000)
         
-        # Build filters based on current selection
-        filters_sales = [
-            {
-                "propertyName": "closedate",
-                "operator": "GTE",
-                "value": str(cutoff)
-            },
-            {
-                "propertyName": "pipeline",
-                "operator": "EQ",
-                "value": "74974043"  # Sales - Global
-            }
-        ]
-        
-        filters_expansion = [
-            {
-                "propertyName": "closedate",
-                "operator": "GTE",
-                "value": str(cutoff)
-            },
-            {
-                "propertyName": "pipeline",
-                "operator": "EQ",
-                "value": "779936085"  # Expansion
-            }
-        ]
-        
-        # Add current filters to both groups
-        additional_filters = []
-        
-        if deal_stage:
-            additional_filters.append({
-                "propertyName": "dealstage",
-                "operator": "EQ",
-                "value": deal_stage
-            })
-        
-        if country:
-            additional_filters.append({
-                "propertyName": "country",
-                "operator": "EQ",
-                "value": country
-            })
-        
-        if billing_state:
-            additional_filters.append({
-                "propertyName": "billing_state",
-                "operator": "EQ",
-                "value": billing_state
-            })
-        
-        if billing_city:
-            additional_filters.append({
-                "propertyName": "billing_city",
-                "operator": "CONTAINS_TOKEN",
-                "value": billing_city
-            })
-        
-        if product:
-            additional_filters.append({
-                "propertyName": "product",
-                "operator": "EQ",
-                "value": product
-            })
-        
-        if specialty:
-            additional_filters.append({
-                "propertyName": "specialty_mcp_use",
-                "operator": "CONTAINS_TOKEN",
-                "value": specialty
-            })
-        
-        filters_sales.extend(additional_filters)
-        filters_expansion.extend(additional_filters)
-        
-        # If user selected specific pipeline, only use that
-        if pipeline:
-            pipeline_id = pipeline if pipeline.isdigit() else mappings['pipelines'].get(pipeline, pipeline)
-            filter_groups = [{
-                "filters": [
-                    {
-                        "propertyName": "closedate",
-                        "operator": "GTE",
-                        "value": str(cutoff)
-                    },
-                    {
-                        "propertyName": "pipeline",
-                        "operator": "EQ",
-                        "value": pipeline_id
-                    }
-                ] + additional_filters
-            }]
-        else:
-            filter_groups = [
-                {"filters": filters_sales},
-                {"filters": filters_expansion}
-            ]
+        # Same filters as /api/deals (minus the minimums), closed since the cutoff
+        filter_groups = build_deal_filter_groups(
+            request.args,
+            {"propertyName": "closedate", "operator": "GTE", "value": str(cutoff)},
+            lambda name: mappings['pipelines'].get(name, name),
+            filter_spec=DEAL_ATTRIBUTE_FILTER_SPEC
+        )
         
-        response = requests.post(
+        response = hubspot_session.post(
             'https://api.hubapi.com/crm/v3/objects/deals/search',
-            headers={
-                'Authorization': f'Bearer {HUBSPOT_API_KEY}',
-                'Content-Type': 'application/json'
-            },
             json={
                 "filterGroups": filter_groups,
+                # Only the properties collected below; pipeline/stage options
+                # come from the cached mappings, not from the deals
                 "properties": [
                     "specialty_mcp_use", "country", "billing_state",
-                    "billing_city", "product", "pipeline", "dealstage"
+                    "billing_city", "product"
                 ],
                 "limit": 200
             }
         )
 
         if response.status_code != 200:
-            return jsonify({'error': 'Failed to fetch filter options', 'details': response.text}), 500
+            return ojsonify({'error': 'Failed to fetch filter options', 'details': response.text}), 500
         
         deals = response.json().get('results', [])
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return ojsonify({'error': str(e)}), 500
     
     # Extract unique values
     specialties = set()
@@ -1105,63 +1907,30 @@ def get_filter_options():
     billing_cities = set()
     products = set()
     
+    # One pass over the deals with each set's add bound up front; blank values
+    # are collected and dropped once per set afterwards instead of tested per deal
+    add_specialty = specialties.add
+    add_country, add_state = countries.add, billing_states.add
+    add_city, add_product = billing_cities.add, products.add
     for deal in deals:
-        props = deal['properties']
+        get = deal['properties'].get
         
         # Specialty - split by semicolon
-        if props.get('specialty_mcp_use'):
-            specialty_value = props['specialty_mcp_use']
-            for spec in str(specialty_value).split(';'):
-                spec_trimmed = spec.strip()
-                if spec_trimmed:
-                    specialties.add(spec_trimmed)
+        specialty_value = get('specialty_mcp_use')
+        if specialty_value:
+            for spec in specialty_value.split(';'):
+                add_specialty(spec.strip())
         
-        if props.get('country'):
-            countries.add(props['country'])
-        
-        if props.get('billing_state'):
-            billing_states.add(props['billing_state'])
-        
-        if props.get('billing_city'):
-            billing_cities.add(props['billing_city'])
-        
-        if props.get('product'):
-            products.add(props['product'])
-    
-    # Build pipeline options
-    
-    pipeline_options = []
-    seen_pipeline_ids = set()
-    for key, value in mappings['pipelines'].items():
-        if isinstance(key, str) and key not in seen_pipeline_ids:
-            pipeline_options.append({
-                'id': mappings['pipelines'].get(key),
-                'name': key
-            })
-            seen_pipeline_ids.add(mappings['pipelines'].get(key))
-
-    allowed_pipelines = ['Sales - Global', 'Expansion']
-    pipeline_options = [
-        p for p in pipeline_options 
-        if p['name'] in allowed_pipelines
-    ]
-
-    # DEAL STAGES: Only show stages from Sales - Global and Expansion pipelines
-    deal_stage_options = [
-        stage for stage in mappings['stage_list']
-        if stage['pipeline'] in allowed_pipelines
-    ]
+        add_country(get('country'))
+        add_state(get('billing_state'))
+        add_city(get('billing_city'))
+        add_product(get('product'))
+
+    for values in (specialties, countries, billing_states, billing_cities, products):
+        values.discard(None)
+        values.discard('')
     
-    # Format for response
-    deal_stage_options_formatted = [
-        {
-            'id': stage['id'],
-            'label': stage['label'],
-            'pipeline': stage['pipeline'],
-            'pipeline_id': stage['pipeline_id']
-        }
-        for stage in deal_stage_options
-    ]
+    pipeline_options, deal_stage_options_formatted = get_pipeline_stage_options(mappings)
 
     # Build deal stage options
     # deal_stage_options = [
@@ -1180,11 +1949,11 @@ def get_filter_options():
         'billing_states': sorted(billing_states),
         'billing_cities': sorted(billing_cities),
         'products': sorted(products),
-        'pipelines': sorted(pipeline_options, key=lambda x: x['name']),
+        'pipelines': pipeline_options,
         'deal_stages': deal_stage_options_formatted
     }
     
-    return jsonify(filter_options)
+    return cached_json_response(cache_key, filter_options, ttl=300)
 
 # ─── Authentication Endpoints ──────────────────────────────────────────────────
 
@@ -1205,26 +1974,26 @@ def login():
     # Rate limiting check
     if _is_rate_limited(ip):
         print(f"[AUTH] Rate limited: {ip}", file=sys.stderr)
-        return jsonify({'error': 'Too many login attempts. Try again in 1 minute.'}), 429
+        return ojsonify({'error': 'Too many login attempts. Try again in 1 minute.'}), 429
 
     data = request.get_json()
     if not data:
         _record_login_attempt(ip)
-        return jsonify({'error': 'Request body is required'}), 400
+        return ojsonify({'error': 'Request body is required'}), 400
 
     email = (data.get('email') or '').strip().lower()
     password = data.get('password') or ''
 
     if not email or not password:
         _record_login_attempt(ip)
-        return jsonify({'error': 'Email and password are required'}), 400
+        return ojsonify({'error': 'Email and password are required'}), 400
 
     # Look up user
     stored_hash = AUTH_USERS.get(email)
     if not stored_hash or not check_password_hash(stored_hash, password):
         _record_login_attempt(ip)
         print(f"[AUTH] Failed login attempt for '{email}' from {ip}", file=sys.stderr)
-        return jsonify({'error': 'Invalid email or password'}), 401
+        return ojsonify({'error': 'Invalid email or password'}), 401
 
     # Success — set session
     session.permanent = True  # Use PERMANENT_SESSION_LIFETIME (24h)
@@ -1233,7 +2002,7 @@ def login():
     session['login_time'] = datetime.utcnow().isoformat()
 
     print(f"[AUTH] Successful login: {email} from {ip}", file=sys.stderr)
-    return jsonify({'success': True, 'email': email})
+    return ojsonify({'success': True, 'email': email})
 
 
 @flask_app.route('/api/logout', methods=['POST'])
@@ -1242,7 +2011,7 @@ def logout():
     email = session.get('email', 'unknown')
     session.clear()
     print(f"[AUTH] Logged out: {email}", file=sys.stderr)
-    return jsonify({'success': True})
+    return ojsonify({'success': True})
 
 
 @flask_app.route('/api/check-auth', methods=['GET'])
@@ -1253,16 +2022,16 @@ def check_auth():
     the dashboard or redirect to the login page.
     """
     if session.get('authenticated'):
-        return jsonify({
+        return ojsonify({
             'authenticated': True,
             'email': session.get('email')
         })
-    return jsonify({'authenticated': False}), 401
+    return ojsonify({'authenticated': False}), 401
 
 
 @flask_app.route('/health', methods=['GET'])
 def health():
-    return jsonify({
+    return ojsonify({
         'status': 'healthy',
         'redis': REDIS_ENABLED,
         'openai': openai_client is not None,
@@ -1270,6 +2039,15 @@ def health():
         'auth_users_configured': len(AUTH_USERS) > 0,
     })
 
+@flask_app.route('/api/hubspot-metadata/refresh', methods=['POST'])
+@require_auth
+def refresh_hubspot_metadata():
+    """Drop cached pipelines/stages and specialty labels on every worker (e.g. after editing them in HubSpot)."""
+    invalidate_hubspot_metadata()
+    # Cached deal lists and filter options embed the old labels; drop them too
+    invalidate_cached_responses('deals', 'filters')
+    return ojsonify({'success': True})
+
 # NEW: Function to get organizations from Definitive with firmographic details
 def get_organizations_from_definitive(company_name=None, state=None, city=None, limit=10):
     """
@@ -1277,9 +2055,6 @@ def get_organizations_from_definitive(company_name=None, state=None, city=None,
     Returns organizations with their definitive_id and key business metrics.
     """
     try:
-        conn = get_databricks_connection()
-        cursor = conn.cursor()
-        
         query = """
         SELECT 
             city,
@@ -1309,18 +2084,100 @@ def get_organizations_from_definitive(company_name=None, state=None, city=None,
         query += " LIMIT ?"
         params.append(limit)
         
-        cursor.execute(query, params)
-        results = cursor.fetchall()
-        columns = [desc[0] for desc in cursor.description]
-        organizations = [dict(zip(columns, row)) for row in results]
-        
-        cursor.close()
-        conn.close()
+        with db_pool.acquire() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            organizations = _fetch_dicts(cursor)
+            cursor.close()
         
         return organizations
     except Exception as e:
         return []
 
+# definitive_id -> physician_group_name. Only found names are kept: a miss or a
+# failed query is retried next time rather than pinned for the life of the worker
+_group_names = {}
+_group_names_lock = threading.Lock()
+_group_names_max = 4096
+
+def _group_name_for(definitive_id):
+    """
+    physician_group_name for a definitive_id, or None if the organization isn't
+    in the companies table. Group names are effectively static, so hits are
+    cached per worker and the contact queries no longer need to join for it.
+    """
+    with _group_names_lock:
+        name = _group_names.get(definitive_id)
+    if name is not None:
+        return name
+    with db_pool.acquire() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+        SELECT physician_group_name
+        FROM prod_analytics_global.exposure.sales__definitive_physician_companies
+        WHERE definitive_id = ?
+        LIMIT 1
+        """, (definitive_id,))
+        row = cursor.fetchone()
+        cursor.close()
+    name = row[0] if row else None
+    if name is not None:
+        with _group_names_lock:
+            if len(_group_names) >= _group_names_max:
+                # Drop the oldest entry (dicts keep insertion order)
+                del _group_names[next(iter(_group_names))]
+            _group_names[definitive_id] = name
+    return name
+
+_PHYSICIANS_QUERY = """
+SELECT 
+    FIRST_NAME,
+    LAST_NAME,
+    PRIMARY_SPECIALTY,
+    EXECUTIVE_FLAG,
+    BUSINESS_EMAIL,
+    DIRECT_EMAIL_PRIMARY,
+    DIRECT_EMAIL_SECONDARY,
+    MOBILE_PHONE_PRIMARY,
+    MOBILE_PHONE_SECONDARY,
+    DEFINITIVE_ID
+FROM prod_analytics_global.ad_hoc.us_phys_report
+WHERE DEFINITIVE_ID = ?
+LIMIT ?
+"""
+
+_EXECUTIVES_QUERY = """
+SELECT 
+    FIRST_NAME,
+    LAST_NAME,
+    PHYSICIAN_LEADER,
+    BUSINESS_EMAIL,
+    DIRECT_EMAIL_PRIMARY,
+    DIRECT_EMAIL_SECONDARY,
+    MOBILE_PHONE_PRIMARY,
+    MOBILE_PHONE_SECONDARY,
+    DEFINITIVE_ID,
+    TITLE,
+    LINKEDIN_PROFILE
+FROM prod_analytics_global.ad_hoc.us_executive_report
+WHERE DEFINITIVE_ID = ?
+LIMIT ?
+"""
+
+# Physician and executive lookups are independent queries; with contact_type
+# "both" one runs here while the other runs on the caller's thread
+_contacts_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='contacts')
+
+
+def _run_contacts_query(query, definitive_id, limit):
+    """Run one contact query on its own pooled connection and return row dicts."""
+    with db_pool.acquire() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, (definitive_id, limit))
+        rows = _fetch_dicts(cursor)
+        cursor.close()
+    return rows
+
 # UPDATED: Function to get contacts using definitive_id from two separate sources
 def get_organization_contacts(definitive_id, contact_type="both", limit=50):
     """
@@ -1335,114 +2192,319 @@ def get_organization_contacts(definitive_id, contact_type="both", limit=50):
         Dictionary with physicians and/or executives lists
     """
     try:
-        conn = get_databricks_connection()
-        cursor = conn.cursor()
-        
         results = {
             "physicians": [],
             "executives": []
         }
-        
-        # Query physicians if requested
-        if contact_type in ["physicians", "both"]:
-            physicians_query = """
-            SELECT 
-                p.FIRST_NAME,
-                p.LAST_NAME,
-                p.PRIMARY_SPECIALTY,
-                p.EXECUTIVE_FLAG,
-                p.BUSINESS_EMAIL,
-                p.DIRECT_EMAIL_PRIMARY,
-                p.DIRECT_EMAIL_SECONDARY,
-                p.MOBILE_PHONE_PRIMARY,
-                p.MOBILE_PHONE_SECONDARY,
-                p.DEFINITIVE_ID,
-                c.physician_group_name
-            FROM prod_analytics_global.ad_hoc.us_phys_report p
-            JOIN prod_analytics_global.exposure.sales__definitive_physician_companies c
-                ON p.DEFINITIVE_ID = c.definitive_id
-            WHERE p.DEFINITIVE_ID = ?
-            LIMIT ?
-            """
-            
-            cursor.execute(physicians_query, (definitive_id, limit))
-            phys_results = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]
-            results["physicians"] = [dict(zip(columns, row)) for row in phys_results]
-        
-        # Query executives if requested
-        if contact_type in ["executives", "both"]:
-            executives_query = """
-            SELECT 
-                e.FIRST_NAME,
-                e.LAST_NAME,
-                e.PHYSICIAN_LEADER,
-                e.BUSINESS_EMAIL,
-                e.DIRECT_EMAIL_PRIMARY,
-                e.DIRECT_EMAIL_SECONDARY,
-                e.MOBILE_PHONE_PRIMARY,
-                e.MOBILE_PHONE_SECONDARY,
-                e.DEFINITIVE_ID,
-                c.physician_group_name,
-                e.TITLE,
-                e.LINKEDIN_PROFILE
-            FROM prod_analytics_global.ad_hoc.us_executive_report e
-            JOIN prod_analytics_global.exposure.sales__definitive_physician_companies c
-                ON e.DEFINITIVE_ID = c.definitive_id
-            WHERE e.DEFINITIVE_ID = ?
-            LIMIT ?
-            """
-            
-            cursor.execute(executives_query, (definitive_id, limit))
-            exec_results = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]
-            results["executives"] = [dict(zip(columns, row)) for row in exec_results]
-        
-        cursor.close()
-        conn.close()
+
+        # Attach the group name in Python instead of joining the companies table;
+        # an organization missing from it has no contacts (as with the old inner join)
+        group_name = _group_name_for(definitive_id)
+        if group_name is None:
+            return results
+
+        want_physicians = contact_type in ["physicians", "both"]
+        want_executives = contact_type in ["executives", "both"]
+
+        # With both requested the two queries overlap, each on its own connection,
+        # so the wait is the slower query rather than the sum of both
+        physicians_future = None
+        if want_physicians and want_executives:
+            physicians_future = _contacts_executor.submit(
+                _run_contacts_query, _PHYSICIANS_QUERY, definitive_id, limit)
+        elif want_physicians:
+            results["physicians"] = _run_contacts_query(_PHYSICIANS_QUERY, definitive_id, limit)
+
+        if want_executives:
+            results["executives"] = _run_contacts_query(_EXECUTIVES_QUERY, definitive_id, limit)
+        if physicians_future is not None:
+            results["physicians"] = physicians_future.result()
+
+        for contact in results["physicians"]:
+            contact["physician_group_name"] = group_name
+        for contact in results["executives"]:
+            contact["physician_group_name"] = group_name
         
         return results
     except Exception as e:
         return {"physicians": [], "executives": [], "error": str(e)}
 
+
+# Bulk variants for a page of organizations: one IN-list query per contact type,
+# returning every reachable contact (the lookalike join's predicates) of each
+# organization; the lookalike cards render all of them, so there is no cap.
+# The group name and id come from the companies table, so ids match the
+# organization dicts they are grouped under
+_PHYSICIANS_BULK_QUERY = """
+SELECT 
+    p.FIRST_NAME,
+    p.LAST_NAME,
+    p.PRIMARY_SPECIALTY,
+    p.EXECUTIVE_FLAG,
+    p.BUSINESS_EMAIL,
+    p.DIRECT_EMAIL_PRIMARY,
+    p.DIRECT_EMAIL_SECONDARY,
+    p.MOBILE_PHONE_PRIMARY,
+    p.MOBILE_PHONE_SECONDARY,
+    c.definitive_id AS DEFINITIVE_ID,
+    c.physician_group_name
+FROM prod_analytics_global.ad_hoc.us_phys_report p
+JOIN prod_analytics_global.exposure.sales__definitive_physician_companies c
+    ON p.DEFINITIVE_ID = c.definitive_id
+WHERE p.DEFINITIVE_ID IN ({placeholders})
+  AND (
+    p.DIRECT_EMAIL_PRIMARY IS NOT NULL
+    OR p.DIRECT_EMAIL_SECONDARY IS NOT NULL
+    OR p.MOBILE_PHONE_PRIMARY IS NOT NULL
+    OR p.MOBILE_PHONE_SECONDARY IS NOT NULL
+  )
+"""
+
+_EXECUTIVES_BULK_QUERY = """
+SELECT 
+    e.FIRST_NAME,
+    e.LAST_NAME,
+    e.PHYSICIAN_LEADER,
+    e.BUSINESS_EMAIL,
+    e.DIRECT_EMAIL_PRIMARY,
+    e.DIRECT_EMAIL_SECONDARY,
+    e.MOBILE_PHONE_PRIMARY,
+    e.MOBILE_PHONE_SECONDARY,
+    c.definitive_id AS DEFINITIVE_ID,
+    e.TITLE,
+    e.LINKEDIN_PROFILE,
+    c.physician_group_name
+FROM prod_analytics_global.ad_hoc.us_executive_report e
+JOIN prod_analytics_global.exposure.sales__definitive_physician_companies c
+    ON e.DEFINITIVE_ID = c.definitive_id
+WHERE e.DEFINITIVE_ID IN ({placeholders})
+  AND (
+    e.LINKEDIN_PROFILE IS NOT NULL
+    OR e.DIRECT_EMAIL_PRIMARY IS NOT NULL
+    OR e.DIRECT_EMAIL_SECONDARY IS NOT NULL
+    OR e.MOBILE_PHONE_PRIMARY IS NOT NULL
+    OR e.MOBILE_PHONE_SECONDARY IS NOT NULL
+  )
+"""
+
+
+def _run_contacts_bulk_query(template, definitive_ids):
+    """Run one bulk contact query on its own pooled connection and return row dicts."""
+    query = template.format(placeholders=", ".join(["?"] * len(definitive_ids)))
+    with db_pool.acquire() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, definitive_ids)
+        rows = _fetch_dicts(cursor)
+        cursor.close()
+    return rows
+
+
+def get_organization_contacts_bulk(definitive_ids, contact_type="both"):
+    """
+    get_organization_contacts for several organizations in one round trip per
+    contact type, without its per-type limit and returning only contacts with a
+    direct email, mobile phone or (executives) LinkedIn profile.
+
+    Args:
+        definitive_ids: definitive IDs of the organizations
+        contact_type: "physicians", "executives", or "both" (default)
+
+    Returns:
+        Dictionary of definitive_id -> {"physicians": [...], "executives": [...]}
+        with an entry for every requested id, or None if the lookup failed
+    """
+    definitive_ids = list(dict.fromkeys(definitive_ids))
+    results = {def_id: {"physicians": [], "executives": []} for def_id in definitive_ids}
+    if not definitive_ids:
+        return results
+    try:
+        want_physicians = contact_type in ["physicians", "both"]
+        want_executives = contact_type in ["executives", "both"]
+
+        physicians_future = None
+        physicians = executives = ()
+        if want_physicians and want_executives:
+            physicians_future = _contacts_executor.submit(
+                _run_contacts_bulk_query, _PHYSICIANS_BULK_QUERY, definitive_ids)
+        elif want_physicians:
+            physicians = _run_contacts_bulk_query(_PHYSICIANS_BULK_QUERY, definitive_ids)
+
+        if want_executives:
+            executives = _run_contacts_bulk_query(_EXECUTIVES_BULK_QUERY, definitive_ids)
+        if physicians_future is not None:
+            physicians = physicians_future.result()
+    except Exception as e:
+        print(f"[CONTACTS] Bulk contact lookup failed for {len(definitive_ids)} orgs: {e}", file=sys.stderr)
+        return None
+
+    for contact in physicians:
+        entry = results.get(contact["DEFINITIVE_ID"])
+        if entry is not None:
+            entry["physicians"].append(contact)
+    for contact in executives:
+        entry = results.get(contact["DEFINITIVE_ID"])
+        if entry is not None:
+            entry["executives"].append(contact)
+    return results
+
 # ========================================
 # LLM-Powered Specialty Expansion
 # ========================================
 
+# Optional pre-aggregated table/view with one combined_main_specialty per row, e.g.
+#   CREATE OR REPLACE MATERIALIZED VIEW <catalog>.<schema>.sales__definitive_specialties AS
+#   SELECT DISTINCT combined_main_specialty
+#   FROM prod_analytics_global.exposure.sales__definitive_physician_companies
+#   WHERE combined_main_specialty IS NOT NULL AND TRIM(combined_main_specialty) != ''
+# Reading it replaces a distinct scan of the companies table on every refresh.
+DEFINITIVE_SPECIALTIES_TABLE = os.getenv('DEFINITIVE_SPECIALTIES_TABLE')
+
+
+def _query_definitive_specialties():
+    """
+    Load the distinct specialties on a pooled connection, sorted (the order the
+    expansion prompt lists them in). The pool drops a connection whose query
+    raised, so one retry runs on a different (or freshly opened) session --
+    covering a warehouse-side disconnect of an idle one.
+    """
+    # Both sources get the same filter: a NULL would break the sort below and a
+    # blank name would end up in the expansion prompt
+    if DEFINITIVE_SPECIALTIES_TABLE:
+        select = f"SELECT combined_main_specialty FROM {DEFINITIVE_SPECIALTIES_TABLE}"
+    else:
+        select = """SELECT DISTINCT combined_main_specialty
+            FROM prod_analytics_global.exposure.sales__definitive_physician_companies"""
+    query = f"""
+            {select}
+            WHERE combined_main_specialty IS NOT NULL
+              AND TRIM(combined_main_specialty) != ''
+        """
+
+    for attempt in range(2):
+        try:
+            with db_pool.acquire() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query)
+                # A few hundred names: sorting here is cheaper than a warehouse-side sort
+                specialties = sorted(row[0] for row in _iter_rows(cursor))
+                cursor.close()
+            return specialties
+        except Exception as e:
+            if attempt:
+                raise
+            print(f"Retrying Definitive specialties query: {e}", file=sys.stderr)
+
+
 def get_definitive_specialties():
     """
     Fetch all distinct combined_main_specialty values from the Definitive table.
     Cached for 24 hours. Returns a list of strings.
+
+    The cache is replaced as one new dict per refresh (never updated key by key),
+    so concurrent readers always see a list, lower_set and prompt that belong
+    together, and the lock lets only one thread run the refresh query.
     """
-    import time
-    now = time.time()
+    global _definitive_specialties_cache
+    cache = _definitive_specialties_cache
+    if cache["specialties"] is not None and time.time() - cache["timestamp"] < _definitive_specialties_ttl:
+        return cache["specialties"]
+
+    with _definitive_specialties_lock:
+        # Another thread may have refreshed it while this one waited
+        cache = _definitive_specialties_cache
+        now = time.time()
+        if cache["specialties"] is not None and now - cache["timestamp"] < _definitive_specialties_ttl:
+            return cache["specialties"]
 
-    if (_definitive_specialties_cache["specialties"] is not None
-            and now - _definitive_specialties_cache["timestamp"] < _definitive_specialties_ttl):
-        return _definitive_specialties_cache["specialties"]
+        try:
+            specialties = _query_definitive_specialties()
+        except Exception as e:
+            print(f"Error fetching Definitive specialties: {e}", file=sys.stderr)
+            if cache["specialties"] is not None:
+                # Keep serving the stale list; try again in 5 minutes, not every call
+                _definitive_specialties_cache = dict(cache, timestamp=now - _definitive_specialties_ttl + 300)
+            return cache["specialties"] or []
+
+        _definitive_specialties_cache = {
+            "specialties": specialties,
+            "lower_set": frozenset(map(str.casefold, specialties)),
+            "expansion_prompt": _build_specialty_expansion_prompt(specialties),
+            "timestamp": now,
+        }
+        return specialties
 
-    try:
-        conn = get_databricks_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT DISTINCT combined_main_specialty
-            FROM prod_analytics_global.exposure.sales__definitive_physician_companies
-            WHERE combined_main_specialty IS NOT NULL
-              AND TRIM(combined_main_specialty) != ''
-            ORDER BY combined_main_specialty
-        """)
-        results = cursor.fetchall()
-        specialties = [row[0] for row in results]
-        cursor.close()
-        conn.close()
 
-        _definitive_specialties_cache["specialties"] = specialties
-        _definitive_specialties_cache["timestamp"] = now
+def _build_specialty_expansion_prompt(definitive_specialties):
+    """
+    Instructions plus the full specialty list, built once per Definitive list
+    refresh (see get_definitive_specialties). It goes in the system message with
+    only the input specialty after it, so every call shares an identical prompt
+    prefix that OpenAI's prompt caching can reuse instead of re-processing the
+    list each time.
+    """
+    specialty_list_str = "\n".join(definitive_specialties)
+    return f"""Given a medical specialty, identify other specialties from the following list that are medically related. "Medically related" means:
+- Subspecialties or parent specialties (e.g., Endocrinology is a subspecialty of Internal Medicine)
+- Specialties that commonly treat the same conditions (e.g., Endocrinology and Diabetes)
+- Specialties with significant clinical overlap
 
-        return specialties
-    except Exception as e:
-        print(f"Error fetching Definitive specialties: {e}", file=sys.stderr)
-        return _definitive_specialties_cache.get("specialties") or []
+IMPORTANT: Only return specialties from this exact list. Do not make up specialties.
+
+Available specialties (one per line):
+{specialty_list_str}
+
+Return ONLY a JSON object whose "related" key holds an array of the top 2 most relevant related specialty strings, ranked by relevance. Nothing else.
+If no related specialties exist, return {{"related": []}}.
+
+Example output format: {{"related": ["Internal Medicine", "Diabetes"]}}"""
+
+
+# Inputs that are never a real specialty: answered with no expansion and never
+# cached or sent to the LLM. Anything longer than the cap is not a specialty name.
+_EXPANSION_BLOCKLIST = frozenset({'', 'n/a', 'na', 'none', 'null', 'other', 'test', 'unknown'})
+_EXPANSION_MAX_INPUT_LEN = 100
+
+
+def _expansion_cache_key(input_specialty):
+    """Normalized cache key for an expansion input, or '' if it should not be expanded."""
+    key = input_specialty.strip().casefold() if input_specialty else ''
+    if len(key) > _EXPANSION_MAX_INPUT_LEN or key in _EXPANSION_BLOCKLIST:
+        return ''
+    return key
+
+
+# Parent/subspecialty and shared-condition relationships that don't need an LLM,
+# keyed by casefolded input and ranked by relevance. Names that aren't in the
+# Definitive list are dropped at lookup, and an input left with nothing falls
+# through to the LLM, so entries only ever answer with real list values.
+KNOWN_SPECIALTY_EXPANSIONS = {
+    'cardiology': ['Interventional Cardiology', 'Cardiovascular Disease'],
+    'endocrinology': ['Internal Medicine', 'Diabetes'],
+    'gastroenterology': ['Hepatology', 'Internal Medicine'],
+    'nephrology': ['Internal Medicine', 'Urology'],
+    'pulmonology': ['Critical Care Medicine', 'Internal Medicine'],
+    'rheumatology': ['Internal Medicine', 'Allergy & Immunology'],
+    'oncology': ['Hematology/Oncology', 'Radiation Oncology'],
+    'hematology': ['Hematology/Oncology', 'Oncology'],
+    'family medicine': ['Internal Medicine', 'General Practice'],
+    'internal medicine': ['Family Medicine', 'General Practice'],
+    'general practice': ['Family Medicine', 'Internal Medicine'],
+    'pediatrics': ['Family Medicine', 'Neonatology'],
+    'neurology': ['Neurosurgery', 'Physical Medicine & Rehabilitation'],
+    'orthopedic surgery': ['Sports Medicine', 'Physical Medicine & Rehabilitation'],
+    'psychiatry': ['Psychology', 'Neurology'],
+    'ophthalmology': ['Optometry'],
+    'urology': ['Nephrology'],
+}
+
+
+def _known_specialty_expansion(cache_key):
+    """Validated static expansion for a normalized input, or [] if none applies."""
+    related = KNOWN_SPECIALTY_EXPANSIONS.get(cache_key)
+    if not related or not get_definitive_specialties():
+        return []
+    definitive_set = _definitive_specialties_cache["lower_set"]
+    return [s for s in related if s.casefold() in definitive_set]
 
 
 def get_expanded_specialties(input_specialty):
@@ -1450,105 +2512,169 @@ def get_expanded_specialties(input_specialty):
     Use Claude to find medically related specialties from the Definitive Healthcare
     specialty list. Returns a list of related specialty strings.
 
+    Common inputs are answered from KNOWN_SPECIALTY_EXPANSIONS without an LLM call.
     Falls back to empty list if Claude API is unavailable.
-    Cached for 24 hours per input specialty.
+    Cached per input specialty: 7 days, or 15 minutes when nothing related was found.
     """
-    import time
 
-    if not input_specialty or not input_specialty.strip():
+    cache_key = _expansion_cache_key(input_specialty)
+    if not cache_key:
         return []
 
-    cache_key = input_specialty.strip().lower()
-
     # Check cache
-    if cache_key in _specialty_expansion_cache:
-        result, timestamp = _specialty_expansion_cache[cache_key]
-        if time.time() - timestamp < _specialty_expansion_ttl:
-            return result
+    cached = _get_cached_expansion(cache_key)
+    if cached is not None:
+        return cached
+
+    # Well-known relationships are answered from the static table, no LLM needed
+    known = _known_specialty_expansion(cache_key)
+    if known:
+        return known
 
     # If no OpenAI client, return empty (graceful degradation)
     if not openai_client:
         return []
 
+    # Single-flight: concurrent misses for the same input wait for the one call
+    # already in progress and then read its cached result
+    with _expansion_inflight_lock:
+        done = _expansion_inflight.get(cache_key)
+        leader = done is None
+        if leader:
+            done = _expansion_inflight[cache_key] = threading.Event()
+    if not leader:
+        done.wait(timeout=_EXPANSION_WAIT_TIMEOUT)
+        cached = _get_cached_expansion(cache_key)
+        return cached if cached is not None else []
+
+    try:
+        return _expand_specialty(input_specialty, cache_key)
+    finally:
+        with _expansion_inflight_lock:
+            _expansion_inflight.pop(cache_key, None)
+        done.set()
+
+
+# cache key -> Event set when the in-flight expansion for it has finished
+_expansion_inflight = {}
+_expansion_inflight_lock = threading.Lock()
+_EXPANSION_WAIT_TIMEOUT = 30  # seconds a coalesced caller waits before giving up
+
+
+def _expand_specialty(input_specialty, cache_key):
+    """The uncached LLM expansion behind get_expanded_specialties; caches its result."""
     # Fetch real Definitive specialties
     definitive_specialties = get_definitive_specialties()
     if not definitive_specialties:
         return []
 
-    specialty_list_str = "\n".join(f"- {s}" for s in definitive_specialties)
-
     try:
+        # JSON mode returns a bare object, and the answer is two short names,
+        # so a small token cap keeps generation time down
         response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            max_tokens=1024,
-            messages=[{
-                "role": "user",
-                "content": f"""Given the medical specialty "{input_specialty}", identify other specialties from the following list that are medically related. "Medically related" means:
-- Subspecialties or parent specialties (e.g., Endocrinology is a subspecialty of Internal Medicine)
-- Specialties that commonly treat the same conditions (e.g., Endocrinology and Diabetes)
-- Specialties with significant clinical overlap
-
-IMPORTANT: Only return specialties from this exact list. Do not make up specialties.
-
-Available specialties:
-{specialty_list_str}
-
-Return ONLY a JSON array of the top 2 most relevant related specialty strings, ranked by relevance. Nothing else.
-Do NOT include the input specialty "{input_specialty}" itself or close spelling variants of it.
-If no related specialties exist, return an empty array [].
-
-Example output format: ["Internal Medicine", "Diabetes"]"""
-            }]
+            model=SPECIALTY_EXPANSION_MODEL,
+            max_tokens=100,
+            temperature=0,
+            response_format={"type": "json_object"},
+            messages=[
+                {"role": "system", "content": _definitive_specialties_cache["expansion_prompt"]},
+                {
+                    "role": "user",
+                    "content": f"""Medical specialty: "{input_specialty}"
+Do NOT include "{input_specialty}" itself or close spelling variants of it."""
+                },
+            ]
         )
 
-        response_text = response.choices[0].message.content.strip()
-
-        # Handle markdown code blocks
-        if response_text.startswith("```"):
-            response_text = response_text.split("\n", 1)[1]
-            response_text = response_text.rsplit("```", 1)[0].strip()
-
-        related = json.loads(response_text)
+        related = orjson.loads(response.choices[0].message.content).get("related")
+        if not isinstance(related, list):
+            related = []
 
         # Validate: only keep specialties that actually exist in the Definitive list
-        definitive_set = set(s.lower() for s in definitive_specialties)
-        validated = [
+        # (case-insensitively; the model sometimes changes capitalization). The
+        # model occasionally repeats a name, so dedupe in order before the cap
+        definitive_set = _definitive_specialties_cache["lower_set"]
+        validated = list(dict.fromkeys(
             s for s in related
-            if isinstance(s, str) and s.lower() in definitive_set
-        ][:2]  # Cap at top 2 most relevant
+            if isinstance(s, str) and s.casefold() in definitive_set
+        ))[:2]  # Cap at top 2 most relevant
 
-        _specialty_expansion_cache[cache_key] = (validated, time.time())
+        ttl = _specialty_expansion_ttl if validated else _specialty_expansion_empty_ttl
+        _set_cached_expansion(cache_key, validated, ttl)
         print(f"LLM specialty expansion: '{input_specialty}' -> {validated}", file=sys.stderr)
         return validated
 
     except Exception as e:
         print(f"Error in LLM specialty expansion for '{input_specialty}': {e}", file=sys.stderr)
         # Cache failure for 5 minutes to avoid hammering the API
-        _specialty_expansion_cache[cache_key] = ([], time.time() - _specialty_expansion_ttl + 300)
+        _set_cached_expansion(cache_key, [], _specialty_expansion_failure_ttl)
         return []
 
 
+# Bounded fan-out for LLM expansion calls (acts as the concurrency semaphore)
+_LLM_MAX_CONCURRENCY = 10
+_llm_executor = ThreadPoolExecutor(max_workers=_LLM_MAX_CONCURRENCY, thread_name_prefix='llm')
+_EXPANSION_FANOUT_TIMEOUT = 5  # seconds
+
+
+def expand_specialties(specialties):
+    """
+    Run get_expanded_specialties for several input specialties concurrently.
+    Returns (results, complete): one result list per input, in input order, and
+    False for complete if any expansion missed the deadline. Inputs that normalize to
+    the same cache key are expanded once, inputs already in this worker's cache
+    are answered inline, and the rest share a _EXPANSION_FANOUT_TIMEOUT deadline
+    so one slow LLM call can't hold up the whole search.
+    """
+    results = {}
+    pending = {}  # cache key -> first spelling seen (that is what the LLM is asked about)
+    for spec in specialties:
+        key = _expansion_cache_key(spec)
+        if key in results or key in pending:
+            continue
+        cached = _specialty_expansion_cache.get(key)
+        if not key:
+            results[key] = []
+        elif cached and time.time() < cached[1]:
+            results[key] = cached[0]
+        else:
+            pending[key] = spec
+
+    # Misses run concurrently under one deadline. A call still running at the
+    # deadline counts as "no expansion" for this request but keeps going in the
+    # background and caches its result for the next one. Callers get complete=False
+    # so they don't cache the degraded search under a key that omits the expansions.
+    complete = True
+    futures = {key: _llm_executor.submit(get_expanded_specialties, spec) for key, spec in pending.items()}
+    if futures:
+        wait(futures.values(), timeout=_EXPANSION_FANOUT_TIMEOUT)
+        for key, future in futures.items():
+            if future.done() and not future.exception():
+                results[key] = future.result()
+            else:
+                print(f"Specialty expansion for '{pending[key]}' not ready, searching without it", file=sys.stderr)
+                results[key] = []
+                complete = False
+
+    return [results[_expansion_cache_key(spec)] for spec in specialties], complete
+
+
 # ========================================
 # Similarity Scoring Function
 # ========================================
 
-def calculate_similarity_score(company_data, definitive_org):
-    """
-    Calculate similarity score between company and Definitive org.
+def _escape_like(value):
+    """Escape LIKE wildcards so a value only matches literally (backslash is Databricks' default ESCAPE)."""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
 
-    Tier-based scoring (highest match wins):
-      Tier 1: same city + same state + same specialty     → 95%
-      Tier 2: same state + same specialty                 → 85%
-      Tier 3: same city + same state + similar specialty  → 75%
-      Tier 4: same city + same state                      → 65%
-      Tier 5: same state + similar specialty              → 55%
 
-    "Same specialty" = exact or fuzzy spelling match against deal specialties.
-    "Similar specialty" = medically related via LLM expansion.
-    State match is always required — no state match → 0.
+def build_company_profile(company_data, expanded_specialties=()):
+    """
+    Normalize the deal side of the similarity comparison once per search.
+    Returns (state, city, specialties, expanded_specialties) with the same
+    field priority and casing rules the scorer has always used.
+    expanded_specialties are the LLM-related specialties for the deal.
     """
-
-    # Extract company data with HubSpot-specific field names
     company_state = (
         str(company_data.get("billing_state", "")).upper().strip() or
         str(company_data.get("lc_us_state", "")).upper().strip() or
@@ -1566,102 +2692,143 @@ def calculate_similarity_score(company_data, definitive_org):
         str(company_data.get("specialties", "")).strip() or
         str(company_data.get("primary_specialty", "")).strip()
     )
-    company_specialties = [s.strip().lower() for s in company_specialty_raw.split(';') if s.strip()]
+    company_specialties = tuple(s.strip().lower() for s in company_specialty_raw.split(';') if s.strip())
+    expanded = tuple(s.lower() for s in expanded_specialties)
+    return (company_state, company_city, company_specialties, expanded)
+
+
+def org_score_key(definitive_org):
+    """Normalized (state, city, specialty) of a Definitive org — all the scorer reads."""
+    return (
+        str(definitive_org.get("state", "")).upper().strip(),
+        str(definitive_org.get("city", "")).lower().strip(),
+        str(definitive_org.get("combined_main_specialty", "")).lower().strip(),
+    )
 
-    # Extract definitive org data
-    org_state = str(definitive_org.get("state", "")).upper().strip()
-    org_city = str(definitive_org.get("city", "")).lower().strip()
-    org_specialty = str(definitive_org.get("combined_main_specialty", "")).lower().strip()
 
-    # State match is required — no state match means 0
-    state_match = bool(company_state and org_state and company_state == org_state)
-    if not state_match:
+def specialty_match_level(profile, org_specialty):
+    """
+    How a normalized org specialty relates to the deal's specialties:
+    2 = same (exact/fuzzy), 1 = similar (LLM-expanded), 0 = neither.
+    Depends only on the specialty string, so bulk scoring calls it once per
+    distinct specialty rather than once per org.
+    """
+    if not org_specialty:
         return 0
+    _, _, company_specialties, expanded = profile
+
+    # Check exact and fuzzy match against deal's own specialties; the plain
+    # substring pass runs over all of them before any fuzzy comparison
+    if any(spec in org_specialty or org_specialty in spec for spec in company_specialties):
+        return 2
+    if any(is_specialty_similar(spec, org_specialty) for spec in company_specialties):
+        return 2
+
+    # Check medically related (LLM expansion) only if no direct match
+    if any(exp_spec in org_specialty or org_specialty in exp_spec for exp_spec in expanded):
+        return 1
+    if any(is_specialty_similar(exp_spec, org_specialty) for exp_spec in expanded):
+        return 1
+    return 0
+
+
+# Tier score indexed by city_match * 3 + specialty_level
+# (specialty_level: 0 = none, 1 = similar, 2 = same)
+_TIER_SCORES = (
+    0,   # State-only match with no city or specialty — not useful
+    55,  # Tier 5: same state + similar specialty
+    85,  # Tier 2: same state + same specialty
+    65,  # Tier 4: same city + same state
+    75,  # Tier 3: same city + same state + similar specialty
+    95,  # Tier 1: same city + same state + same specialty
+)
 
-    # City match
-    city_match = bool(company_city and org_city and company_city in org_city)
 
-    # Specialty matching: same (exact/fuzzy) vs similar (LLM-expanded)
-    same_specialty = False
-    similar_specialty = False
+def tier_score(city_match, specialty_level):
+    """
+    Tier score for a state-matched org from its city match and specialty level.
 
-    if org_specialty:
-        # Check exact and fuzzy match against deal's own specialties
-        for spec in company_specialties:
-            if spec in org_specialty or org_specialty in spec:
-                same_specialty = True
-                break
-            elif is_specialty_similar(spec, org_specialty):
-                same_specialty = True
-                break
+    Tier-based scoring (highest match wins):
+      Tier 1: same city + same state + same specialty     → 95%
+      Tier 2: same state + same specialty                 → 85%
+      Tier 3: same city + same state + similar specialty  → 75%
+      Tier 4: same city + same state                      → 65%
+      Tier 5: same state + similar specialty              → 55%
 
-        # Check medically related (LLM expansion) only if no direct match
-        if not same_specialty:
-            expanded = company_data.get('_expanded_specialties', [])
-            for exp_spec in expanded:
-                if exp_spec.lower() in org_specialty or org_specialty in exp_spec.lower():
-                    similar_specialty = True
-                    break
-                elif is_specialty_similar(exp_spec.lower(), org_specialty):
-                    similar_specialty = True
-                    break
+    "Same specialty" = exact or fuzzy spelling match against deal specialties.
+    "Similar specialty" = medically related via LLM expansion.
+    State match is always required — no state match → 0.
+    """
+    return _TIER_SCORES[3 * bool(city_match) + specialty_level]
+
+
+# Common medical specialty variations: two specialties that each contain a
+# variation of the same root are treated as the same specialty
+_SPECIALTY_ROOTS = {
+    'cardio': ('cardiology', 'cardiologist', 'cardiac'),
+    'pediatr': ('pediatrics', 'pediatrician', 'pediatric'),
+    'orthoped': ('orthopedics', 'orthopedic', 'orthopaedic'),
+    'dermat': ('dermatology', 'dermatologist', 'dermatological'),
+    'neurol': ('neurology', 'neurologist', 'neurological'),
+    'oncol': ('oncology', 'oncologist'),
+    'gastro': ('gastroenterology', 'gastroenterologist'),
+    'pulmon': ('pulmonology', 'pulmonologist', 'pulmonary'),
+    'nephr': ('nephrology', 'nephrologist'),
+    'endocrin': ('endocrinology', 'endocrinologist'),
+    'rheumat': ('rheumatology', 'rheumatologist'),
+    'urol': ('urology', 'urologist'),
+    'ophthal': ('ophthalmology', 'ophthalmologist'),
+    'psych': ('psychiatry', 'psychiatrist', 'psychiatric', 'psychology', 'psychologist'),
+    'anesth': ('anesthesiology', 'anesthesiologist'),
+    'radiol': ('radiology', 'radiologist', 'radiological'),
+    'pathol': ('pathology', 'pathologist'),
+    'emergency': ('emergency medicine', 'emergency', 'er'),
+    'family': ('family medicine', 'family practice', 'family physician'),
+    'internal': ('internal medicine', 'internist'),
+    'surgery': ('surgery', 'surgeon', 'surgical'),
+}
 
-    # Tier-based scoring
-    if city_match and same_specialty:
-        return 95  # Tier 1: same city + same state + same specialty
-    elif same_specialty:
-        return 85  # Tier 2: same state + same specialty
-    elif city_match and similar_specialty:
-        return 75  # Tier 3: same city + same state + similar specialty
-    elif city_match:
-        return 65  # Tier 4: same city + same state
-    elif similar_specialty:
-        return 55  # Tier 5: same state + similar specialty
-    else:
-        return 0   # State-only match with no city or specialty — not useful
 
+# Every variation mapped to its root, and one pattern that finds them all in a
+# single pass. The zero-width lookahead reports a match at every start offset,
+# so overlapping variations are all seen; no variation is a prefix of another
+# root's variation, so the first alternative at an offset names the right root.
+_SPECIALTY_VARIATION_ROOTS = {
+    var: root for root, variations in _SPECIALTY_ROOTS.items() for var in variations
+}
+_SPECIALTY_VARIATION_RE = re.compile(
+    '(?=(' + '|'.join(map(re.escape, sorted(_SPECIALTY_VARIATION_ROOTS, key=len, reverse=True))) + '))'
+)
+
+
+@lru_cache(maxsize=4096)
+def _specialty_features(spec):
+    """(roots whose variations appear in spec, set of words of 4+ chars) — per distinct string."""
+    roots = frozenset(
+        _SPECIALTY_VARIATION_ROOTS[m.group(1)] for m in _SPECIALTY_VARIATION_RE.finditer(spec)
+    )
+    return roots, frozenset(w for w in spec.split() if len(w) >= 4)
+
+
+@lru_cache(maxsize=65536)
 def is_specialty_similar(spec1, spec2):
     """
     Check if two specialties are similar using fuzzy matching.
     Handles variations like: cardiology/cardiologist, pediatrics/pediatrician, etc.
+    Specialty strings repeat across every org in a search, so each string's
+    features and each pair's answer are computed once per process.
     """
-    # Common medical specialty variations
-    specialty_roots = {
-        'cardio': ['cardiology', 'cardiologist', 'cardiac'],
-        'pediatr': ['pediatrics', 'pediatrician', 'pediatric'],
-        'orthoped': ['orthopedics', 'orthopedic', 'orthopaedic'],
-        'dermat': ['dermatology', 'dermatologist', 'dermatological'],
-        'neurol': ['neurology', 'neurologist', 'neurological'],
-        'oncol': ['oncology', 'oncologist'],
-        'gastro': ['gastroenterology', 'gastroenterologist'],
-        'pulmon': ['pulmonology', 'pulmonologist', 'pulmonary'],
-        'nephr': ['nephrology', 'nephrologist'],
-        'endocrin': ['endocrinology', 'endocrinologist'],
-        'rheumat': ['rheumatology', 'rheumatologist'],
-        'urol': ['urology', 'urologist'],
-        'ophthal': ['ophthalmology', 'ophthalmologist'],
-        'psych': ['psychiatry', 'psychiatrist', 'psychiatric', 'psychology', 'psychologist'],
-        'anesth': ['anesthesiology', 'anesthesiologist'],
-        'radiol': ['radiology', 'radiologist', 'radiological'],
-        'pathol': ['pathology', 'pathologist'],
-        'emergency': ['emergency medicine', 'emergency', 'er'],
-        'family': ['family medicine', 'family practice', 'family physician'],
-        'internal': ['internal medicine', 'internist'],
-        'surgery': ['surgery', 'surgeon', 'surgical']
-    }
-    
-    # Check if either specialty contains a common root
-    for root, variations in specialty_roots.items():
-        spec1_match = any(var in spec1 for var in variations)
-        spec2_match = any(var in spec2 for var in variations)
-        
-        if spec1_match and spec2_match:
-            return True
-    
-    # Check for simple word overlap (at least 4 characters)
-    words1 = [w for w in spec1.split() if len(w) >= 4]
-    words2 = [w for w in spec2.split() if len(w) >= 4]
+    roots1, words1 = _specialty_features(spec1)
+    roots2, words2 = _specialty_features(spec2)
+
+    # Check if both specialties contain a common root
+    if not roots1.isdisjoint(roots2):
+        return True
     
+    # Check for simple word overlap (at least 4 characters): a shared word is
+    # a set intersection; only otherwise look for one word inside another
+    if not words1.isdisjoint(words2):
+        return True
     for w1 in words1:
         for w2 in words2:
             if w1 in w2 or w2 in w1:
@@ -1670,6 +2837,19 @@ def is_specialty_similar(spec1, spec2):
     return False
 
 # Analyze company and find lookalikes
+def _paginate_lookalikes(full_result, page, page_size):
+    """One page of a full (possibly cached) lookalike result, with paging fields added."""
+    total_orgs = full_result["total_matches"]
+    start_idx = (page - 1) * page_size
+    return {
+        **full_result,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": (total_orgs + page_size - 1) // page_size,
+        "lookalike_organizations": full_result["lookalike_organizations"][start_idx:start_idx + page_size]
+    }
+
+
 def find_lookalikes_from_company_data(company_data, similarity_threshold=85, max_results=None, include_contacts=True, page=1, page_size=10, use_cache=True):
     """
     Find similar organizations based on provided company data.
@@ -1720,26 +2900,18 @@ def find_lookalikes_from_company_data(company_data, similarity_threshold=85, max
     # Keep original for cache key compatibility; use first specialty as primary
     specialty = specialty_list[0] if specialty_list else None
 
-    # LLM-based specialty expansion: find medically related specialties
+    # LLM-based specialty expansion: find medically related specialties,
+    # keeping the first spelling of each and skipping the deal's own
+    seen = {s.lower() for s in specialty_list}
     expanded_specialties = []
-    for spec in specialty_list:
-        expanded = get_expanded_specialties(spec)
+    expansions, expansion_complete = expand_specialties(specialty_list)
+    for expanded in expansions:
         for exp_spec in expanded:
-            if exp_spec.lower() not in [s.lower() for s in specialty_list]:
+            lowered = exp_spec.lower()
+            if lowered not in seen:
+                seen.add(lowered)
                 expanded_specialties.append(exp_spec)
 
-    # Deduplicate expanded list
-    seen = set()
-    unique_expanded = []
-    for spec in expanded_specialties:
-        if spec.lower() not in seen:
-            seen.add(spec.lower())
-            unique_expanded.append(spec)
-    expanded_specialties = unique_expanded
-
-    # Store expanded specialties on company_data so scoring functions can access them
-    company_data['_expanded_specialties'] = expanded_specialties
-
     # Resolve effective city
     city = (
         company_data.get("billing_city") or
@@ -1757,10 +2929,15 @@ def find_lookalikes_from_company_data(company_data, similarity_threshold=85, max
     print(f"  all company_data keys = {list(company_data.keys())}", file=sys.stderr)
     print(f"{'='*60}\n", file=sys.stderr)
 
-    # OPTIMIZATION: Check cache first
+    # Deal side of the scoring, normalized once; also drives the SQL filter
+    profile = build_company_profile(company_data, expanded_specialties)
+
+    # OPTIMIZATION: Check cache first. The city is part of the key: it decides
+    # the same-city tier and, with no specialty, the SQL filter itself
     cache_key = get_cache_key(
         "find_lookalikes",
         state=state,
+        city=profile[1],
         specialty=specialty,
         expanded_specialties=sorted([s.lower() for s in expanded_specialties]),
         threshold=similarity_threshold,
@@ -1768,273 +2945,262 @@ def find_lookalikes_from_company_data(company_data, similarity_threshold=85, max
         include_contacts=include_contacts
     )
     
+    cache_lock_token = None
     if use_cache:
-        cached = get_cached_result(cache_key)
+        cached, cache_lock_token = get_cached_or_lock(cache_key)
         if cached:
-            # Apply pagination to cached results
-            total_orgs = cached["total_matches"]
-            start_idx = (page - 1) * page_size
-            end_idx = start_idx + page_size
-            
-            return {
-                **cached,
-                "page": page,
-                "page_size": page_size,
-                "total_pages": (total_orgs + page_size - 1) // page_size,
-                "lookalike_organizations": cached["lookalike_organizations"][start_idx:end_idx]
-            }
-    
-    conn = get_databricks_connection()
-    cursor = conn.cursor()
+            return _paginate_lookalikes({**cached, "expanded_specialties": expanded_specialties,
+                                         "expansion_complete": expansion_complete}, page, page_size)
     
+    search_specialties = specialty_list + expanded_specialties
+
     # EXHAUSTIVE SEARCH: No artificial limits, get ALL matching organizations
     # Only filter by state (required) and optionally by specialty
-    if include_contacts:
-        query = f"""
-        WITH filtered_orgs AS (
-            SELECT
-                definitive_id,
-                physician_group_name,
-                combined_main_specialty,
-                state,
-                city,
-                zip_code,
-                physician_count,
-                ambulatory_emr,
-                hs_id,
-                website
-            FROM prod_analytics_global.exposure.sales__definitive_physician_companies
-            WHERE UPPER(state) = '{state.upper()}'
-            {("AND (" + " OR ".join(f"LOWER(combined_main_specialty) LIKE LOWER('%{s}%')" for s in (specialty_list + expanded_specialties)) + ")") if (specialty_list or expanded_specialties) else ""}
-        ),
-        physicians AS (
-            SELECT 
-                p.FIRST_NAME as phys_first_name,
-                p.LAST_NAME as phys_last_name,
-                p.PRIMARY_SPECIALTY,
-                p.EXECUTIVE_FLAG,
-                p.BUSINESS_EMAIL as phys_business_email,
-                p.DIRECT_EMAIL_PRIMARY as phys_direct_email_primary,
-                p.DIRECT_EMAIL_SECONDARY as phys_direct_email_secondary,
-                p.MOBILE_PHONE_PRIMARY as phys_mobile_primary,
-                p.MOBILE_PHONE_SECONDARY as phys_mobile_secondary,
-                p.DEFINITIVE_ID as phys_definitive_id,
-                c.physician_group_name as phys_group_name
-            FROM prod_analytics_global.ad_hoc.us_phys_report p
-             JOIN prod_analytics_global.exposure.sales__definitive_physician_companies c
-                ON p.DEFINITIVE_ID = c.definitive_id
-            WHERE p.DEFINITIVE_ID IN (SELECT definitive_id FROM filtered_orgs)
-              AND (
-                p.DIRECT_EMAIL_PRIMARY IS NOT NULL 
-                OR p.DIRECT_EMAIL_SECONDARY IS NOT NULL 
-                OR p.MOBILE_PHONE_PRIMARY IS NOT NULL 
-                OR p.MOBILE_PHONE_SECONDARY IS NOT NULL
-              )
-        ),
-        executives AS (
-            SELECT 
-                e.FIRST_NAME as exec_first_name,
-                e.LAST_NAME as exec_last_name,
-                e.PHYSICIAN_LEADER,
-                e.BUSINESS_EMAIL as exec_business_email,
-                e.DIRECT_EMAIL_PRIMARY as exec_direct_email_primary,
-                e.DIRECT_EMAIL_SECONDARY as exec_direct_email_secondary,
-                e.MOBILE_PHONE_PRIMARY as exec_mobile_primary,
-                e.MOBILE_PHONE_SECONDARY as exec_mobile_secondary,
-                e.DEFINITIVE_ID as exec_definitive_id,
-                c.physician_group_name as exec_group_name,
-                e.TITLE,
-                e.LINKEDIN_PROFILE
-            FROM prod_analytics_global.ad_hoc.us_executive_report e
-            JOIN prod_analytics_global.exposure.sales__definitive_physician_companies c
-                ON e.DEFINITIVE_ID = c.definitive_id 
-            WHERE e.DEFINITIVE_ID IN (SELECT definitive_id FROM filtered_orgs)
-              AND (
-                e.LINKEDIN_PROFILE IS NOT NULL 
-                OR e.DIRECT_EMAIL_PRIMARY IS NOT NULL 
-                OR e.DIRECT_EMAIL_SECONDARY IS NOT NULL 
-                OR e.MOBILE_PHONE_PRIMARY IS NOT NULL 
-                OR e.MOBILE_PHONE_SECONDARY IS NOT NULL
-              )
-        )
-        SELECT 
-            o.*,
-            p.phys_first_name,
-            p.phys_last_name,
-            p.PRIMARY_SPECIALTY,
-            p.EXECUTIVE_FLAG,
-            p.phys_business_email,
-            p.phys_direct_email_primary,
-            p.phys_direct_email_secondary,
-            p.phys_mobile_primary,
-            p.phys_mobile_secondary,
-            p.phys_group_name,
-            e.exec_first_name,
-            e.exec_last_name,
-            e.PHYSICIAN_LEADER,
-            e.exec_business_email,
-            e.exec_direct_email_primary,
-            e.exec_direct_email_secondary,
-            e.exec_mobile_primary,
-            e.exec_mobile_secondary,
-            e.exec_group_name,
-            e.TITLE,
-            e.LINKEDIN_PROFILE
-        FROM filtered_orgs o
-        LEFT JOIN physicians p ON o.definitive_id = p.phys_definitive_id
-        LEFT JOIN executives e ON o.definitive_id = e.exec_definitive_id
-        """
+    # Values are bound, not interpolated, so the statement text only varies
+    # with the number of specialties and Databricks can reuse its plan
+    params = [state.upper()]
+    if search_specialties:
+        # ILIKE matches case-insensitively without wrapping the column in LOWER()
+        org_filter = "AND (" + " OR ".join(["combined_main_specialty ILIKE ?"] * len(search_specialties)) + ")"
+        params.extend(f"%{s}%" for s in search_specialties)
+    elif profile[1]:
+        # With no specialties the only reachable tier is same city (65), so let
+        # Databricks drop the rest of the state instead of shipping it here
+        # (with all its contacts) just to score 0
+        org_filter = "AND city ILIKE ?"
+        params.append(f"%{_escape_like(profile[1])}%")
     else:
-        # If not including contacts, just get ALL organizations matching criteria
-        query = f"""
-        SELECT
-            definitive_id,
-            physician_group_name,
-            combined_main_specialty,
-            state,
-            city,
-            zip_code,
-            physician_count,
-            ambulatory_emr,
-            hs_id,
-            website
+        # No specialty and no city: nothing can reach a scoring tier
+        org_filter = None
+
+    # Orgs and their contacts are fetched as three flat result sets rather than
+    # one org x physician x executive join, which returned every physician
+    # paired with every executive of the same org. Contact queries run on
+    # their own pooled connections while the org query runs here.
+    org_query = f"""
+    SELECT
+        definitive_id,
+        physician_group_name,
+        combined_main_specialty,
+        state,
+        city,
+        zip_code,
+        physician_count,
+        ambulatory_emr,
+        hs_id,
+        website
+    FROM prod_analytics_global.exposure.sales__definitive_physician_companies
+    WHERE UPPER(state) = ?
+    {org_filter}
+    """
+    filtered_orgs_cte = f"""
+    WITH filtered_orgs AS (
+        SELECT definitive_id, physician_group_name
         FROM prod_analytics_global.exposure.sales__definitive_physician_companies
-        WHERE UPPER(state) = '{state.upper()}'
-        {("AND (" + " OR ".join(f"LOWER(combined_main_specialty) LIKE LOWER('%{s}%')" for s in (specialty_list + expanded_specialties)) + ")") if (specialty_list or expanded_specialties) else ""}
-        """
-    
+        WHERE UPPER(state) = ?
+        {org_filter}
+    )
+    """
+    physicians_query = filtered_orgs_cte + """
+    SELECT 
+        p.FIRST_NAME as phys_first_name,
+        p.LAST_NAME as phys_last_name,
+        p.PRIMARY_SPECIALTY,
+        p.EXECUTIVE_FLAG,
+        p.BUSINESS_EMAIL as phys_business_email,
+        p.DIRECT_EMAIL_PRIMARY as phys_direct_email_primary,
+        p.DIRECT_EMAIL_SECONDARY as phys_direct_email_secondary,
+        p.MOBILE_PHONE_PRIMARY as phys_mobile_primary,
+        p.MOBILE_PHONE_SECONDARY as phys_mobile_secondary,
+        p.DEFINITIVE_ID as phys_definitive_id,
+        f.physician_group_name as phys_group_name
+    FROM prod_analytics_global.ad_hoc.us_phys_report p
+    JOIN filtered_orgs f
+        ON p.DEFINITIVE_ID = f.definitive_id
+    WHERE (
+        p.DIRECT_EMAIL_PRIMARY IS NOT NULL 
+        OR p.DIRECT_EMAIL_SECONDARY IS NOT NULL 
+        OR p.MOBILE_PHONE_PRIMARY IS NOT NULL 
+        OR p.MOBILE_PHONE_SECONDARY IS NOT NULL
+      )
+    """
+    executives_query = filtered_orgs_cte + """
+    SELECT 
+        e.FIRST_NAME as exec_first_name,
+        e.LAST_NAME as exec_last_name,
+        e.PHYSICIAN_LEADER,
+        e.BUSINESS_EMAIL as exec_business_email,
+        e.DIRECT_EMAIL_PRIMARY as exec_direct_email_primary,
+        e.DIRECT_EMAIL_SECONDARY as exec_direct_email_secondary,
+        e.MOBILE_PHONE_PRIMARY as exec_mobile_primary,
+        e.MOBILE_PHONE_SECONDARY as exec_mobile_secondary,
+        e.DEFINITIVE_ID as exec_definitive_id,
+        f.physician_group_name as exec_group_name,
+        e.TITLE,
+        e.LINKEDIN_PROFILE
+    FROM prod_analytics_global.ad_hoc.us_executive_report e
+    JOIN filtered_orgs f
+        ON e.DEFINITIVE_ID = f.definitive_id
+    WHERE (
+        e.LINKEDIN_PROFILE IS NOT NULL 
+        OR e.DIRECT_EMAIL_PRIMARY IS NOT NULL 
+        OR e.DIRECT_EMAIL_SECONDARY IS NOT NULL 
+        OR e.MOBILE_PHONE_PRIMARY IS NOT NULL 
+        OR e.MOBILE_PHONE_SECONDARY IS NOT NULL
+      )
+    """
+
+    rows = []
+    phys_rows = exec_rows = ()
+    phys_checked = exec_checked = True
     try:
-        cursor.execute(query)
-        results = cursor.fetchall()
-        columns = [desc[0] for desc in cursor.description]
-        rows = [dict(zip(columns, row)) for row in results]
+        if org_filter is not None:
+            if include_contacts:
+                phys_future = _contacts_executor.submit(
+                    _run_lookalike_query, physicians_query, params, _PHYS_CONTACT_COLUMNS)
+                exec_future = _contacts_executor.submit(
+                    _run_lookalike_query, executives_query, params, _EXEC_CONTACT_COLUMNS)
+            rows, _ = _run_lookalike_query(org_query, params)
+            if include_contacts:
+                phys_rows, phys_checked = phys_future.result()
+                exec_rows, exec_checked = exec_future.result()
     except Exception as e:
-        cursor.close()
-        conn.close()
+        if cache_lock_token:
+            release_cache_lock(cache_key, cache_lock_token)
         return {
             "error": f"Failed to query Definitive Healthcare: {str(e)}",
             "company_data": company_data
         }
     
-    cursor.close()
-    conn.close()
-    
-    # Process results in-memory
-    if include_contacts and rows:
-        # Group rows by organization
-        org_map = {}
-        for row in rows:
-            def_id = row.get("definitive_id")
-            
-            # Initialize organization if not seen
-            if def_id not in org_map:
-                org_map[def_id] = {
-                    "definitive_id": def_id,
-                    "physician_group_name": row.get("physician_group_name"),
-                    "combined_main_specialty": row.get("combined_main_specialty"),
-                    "state": row.get("state"),
-                    "city": row.get("city"),
-                    "zip_code": row.get("zip_code"),
-                    "physician_count": row.get("physician_count"),
-                    "ambulatory_emr": row.get("ambulatory_emr"),
-                    "hs_id": row.get("hs_id"),
-                    "website": row.get("website"),
-                    "physicians": [],
-                    "executives": []
-                }
-            
-            # Add physician if present and has valid contact info
-            if row.get("phys_first_name"):
-                phys = {
-                    "FIRST_NAME": row.get("phys_first_name"),
-                    "LAST_NAME": row.get("phys_last_name"),
-                    "PRIMARY_SPECIALTY": row.get("PRIMARY_SPECIALTY"),
-                    "EXECUTIVE_FLAG": row.get("EXECUTIVE_FLAG"),
-                    "BUSINESS_EMAIL": row.get("phys_business_email"),
-                    "DIRECT_EMAIL_PRIMARY": row.get("phys_direct_email_primary"),
-                    "DIRECT_EMAIL_SECONDARY": row.get("phys_direct_email_secondary"),
-                    "MOBILE_PHONE_PRIMARY": row.get("phys_mobile_primary"),
-                    "MOBILE_PHONE_SECONDARY": row.get("phys_mobile_secondary"),
-                    "physician_group_name": row.get("phys_group_name")
-                }
-                # Double-check valid contact info and avoid duplicates
-                if has_valid_contact_info(phys, "physician") and phys not in org_map[def_id]["physicians"]:
-                    org_map[def_id]["physicians"].append(phys)
-            
-            # Add executive if present and has valid contact info
-            if row.get("exec_first_name"):
-                exec_data = {
-                    "FIRST_NAME": row.get("exec_first_name"),
-                    "LAST_NAME": row.get("exec_last_name"),
-                    "PHYSICIAN_LEADER": row.get("PHYSICIAN_LEADER"),
-                    "BUSINESS_EMAIL": row.get("exec_business_email"),
-                    "DIRECT_EMAIL_PRIMARY": row.get("exec_direct_email_primary"),
-                    "DIRECT_EMAIL_SECONDARY": row.get("exec_direct_email_secondary"),
-                    "MOBILE_PHONE_PRIMARY": row.get("exec_mobile_primary"),
-                    "MOBILE_PHONE_SECONDARY": row.get("exec_mobile_secondary"),
-                    "physician_group_name": row.get("exec_group_name"),
-                    "TITLE": row.get("TITLE"),
-                    "LINKEDIN_PROFILE": row.get("LINKEDIN_PROFILE")
-                }
-                # Double-check valid contact info and avoid duplicates
-                if has_valid_contact_info(exec_data, "executive") and exec_data not in org_map[def_id]["executives"]:
-                    org_map[def_id]["executives"].append(exec_data)
-        
-        orgs = list(org_map.values())
-    else:
-        # No contacts requested, just convert rows to org format
-        orgs = [{
-            "definitive_id": row.get("definitive_id"),
-            "physician_group_name": row.get("physician_group_name"),
-            "combined_main_specialty": row.get("combined_main_specialty"),
-            "state": row.get("state"),
-            "city": row.get("city"),
-            "zip_code": row.get("zip_code"),
-            "physician_count": row.get("physician_count"),
-            "ambulatory_emr": row.get("ambulatory_emr"),
-            "hs_id": row.get("hs_id"),
-            "website": row.get("website"),
-            "physicians": [],
-            "executives": []
-        } for row in rows]
+    # One org per definitive_id; contacts are attached after scoring
+    org_map = {}
+    for row in rows:
+        def_id = row.get("definitive_id")
+        if def_id not in org_map:
+            org_map[def_id] = {
+                "definitive_id": def_id,
+                "physician_group_name": row.get("physician_group_name"),
+                "combined_main_specialty": row.get("combined_main_specialty"),
+                "state": row.get("state"),
+                "city": row.get("city"),
+                "zip_code": row.get("zip_code"),
+                "physician_count": row.get("physician_count"),
+                "ambulatory_emr": row.get("ambulatory_emr"),
+                "hs_id": row.get("hs_id"),
+                "website": row.get("website"),
+                "physicians": [],
+                "executives": []
+            }
+    orgs = list(org_map.values())
     
+
     # Lower threshold when LLM expansion is active so medically related (State+MedRelated=75) results appear
     effective_threshold = 55 if expanded_specialties else 65
 
-    # Parallel similarity scoring using multiprocessing
-    try:
-        # Prepare arguments for parallel processing
-        scoring_args = [(company_data, org) for org in orgs]
-        
-        # Use multiprocessing pool (limit to reasonable number of workers)
-        num_workers = min(cpu_count(), len(orgs), 8)  # Max 8 workers
-        
-        if num_workers > 1 and len(orgs) > 10:  # Only use parallel for larger datasets
-            with Pool(num_workers) as pool:
-                scoring_results = pool.map(score_single_org, scoring_args)
-        else:
-            # For small datasets, serial processing is faster (no overhead)
-            scoring_results = [score_single_org(args) for args in scoring_args]
-        
-        # Build scored organizations - EXHAUSTIVE: include ALL that meet threshold
-        scored_orgs = []
-        for org, score, reasons in scoring_results:
-            if score >= effective_threshold:
-                org["similarity_score"] = score
-                org["match_reasons"] = reasons
-                scored_orgs.append(org)
-
-    except Exception as e:
-        # Fallback to serial processing if parallel fails
-        print(f"Parallel processing failed, using serial: {e}")
-        scored_orgs = []
-        for org in orgs:
-            score = calculate_similarity_score(company_data, org)
-            if score >= effective_threshold:
-                org["similarity_score"] = score
-                org["match_reasons"] = get_match_reasons(company_data, org, score)
-                scored_orgs.append(org)
+    # Similarity scoring, in process. The deal profile is normalized once;
+    # each org is reduced to its (state, city, specialty) key, identical keys
+    # (common across a state) are scored once, and the specialty comparison —
+    # the only non-trivial part — runs once per distinct org specialty.
+    # Raw (state, city, specialty) triples repeat heavily within a state, so
+    # each distinct triple is normalized once and its key shared across orgs
+    normalized_keys = {}
+    org_keys = []
+    for org in orgs:
+        raw = (org["state"], org["city"], org["combined_main_specialty"])
+        key = normalized_keys.get(raw)
+        if key is None:
+            key = normalized_keys[raw] = org_score_key(org)
+        org_keys.append(key)
+    unique_keys = list(dict.fromkeys(normalized_keys.values()))
+    # State, city and specialty are each compared once per distinct value;
+    # a key's score is then just a lookup into those three tables
+    company_state, company_city = profile[0], profile[1]
+    state_matches = {
+        state: bool(company_state and state and state == company_state)
+        for state in {key[0] for key in unique_keys}
+    }
+    city_matches = {
+        city: bool(company_city and city and company_city in city)
+        for city in {key[1] for key in unique_keys}
+    }
+    specialty_levels = {
+        spec: specialty_match_level(profile, spec)
+        for spec in {key[2] for key in unique_keys}
+    }
+    key_scores = [
+        tier_score(city_matches[city], specialty_levels[spec]) if state_matches[state] else 0
+        for state, city, spec in unique_keys
+    ]
+    score_by_key = dict(zip(unique_keys, key_scores))
+
+    # Build scored organizations - EXHAUSTIVE: include ALL that meet threshold.
+    # Match reasons are only built for orgs that make the cut.
+    # Reasons depend only on the score and the raw location/specialty, so they
+    # are built once per distinct combination and copied per org.
+    scored_orgs = []
+    reasons_by_raw = {}
+    for org, key in zip(orgs, org_keys):
+        score = score_by_key[key]
+        if score >= effective_threshold:
+            raw = (score, org["state"], org["city"], org["combined_main_specialty"])
+            reasons = reasons_by_raw.get(raw)
+            if reasons is None:
+                reasons = reasons_by_raw[raw] = get_match_reasons(company_data, org, score)
+            org["similarity_score"] = score
+            org["match_reasons"] = list(reasons)
+            scored_orgs.append(org)
     
+    # Attach contacts to the orgs that made the cut. Rows that repeat a
+    # contact already attached to the org are skipped via a set of row tuples.
+    if include_contacts and scored_orgs:
+        scored_by_id = {org["definitive_id"]: org for org in scored_orgs}
+        seen_contacts = set()
+        for row in phys_rows:
+            org = scored_by_id.get(row.get("phys_definitive_id"))
+            if org is None or not row.get("phys_first_name"):
+                continue
+            phys = {
+                "FIRST_NAME": row.get("phys_first_name"),
+                "LAST_NAME": row.get("phys_last_name"),
+                "PRIMARY_SPECIALTY": row.get("PRIMARY_SPECIALTY"),
+                "EXECUTIVE_FLAG": row.get("EXECUTIVE_FLAG"),
+                "BUSINESS_EMAIL": row.get("phys_business_email"),
+                "DIRECT_EMAIL_PRIMARY": row.get("phys_direct_email_primary"),
+                "DIRECT_EMAIL_SECONDARY": row.get("phys_direct_email_secondary"),
+                "MOBILE_PHONE_PRIMARY": row.get("phys_mobile_primary"),
+                "MOBILE_PHONE_SECONDARY": row.get("phys_mobile_secondary"),
+                "physician_group_name": row.get("phys_group_name")
+            }
+            if not phys_checked and not has_valid_contact_info(phys, "physician"):
+                continue
+            dedupe_key = ("physician", org["definitive_id"], *phys.values())
+            if dedupe_key not in seen_contacts:
+                seen_contacts.add(dedupe_key)
+                org["physicians"].append(phys)
+        for row in exec_rows:
+            org = scored_by_id.get(row.get("exec_definitive_id"))
+            if org is None or not row.get("exec_first_name"):
+                continue
+            exec_data = {
+                "FIRST_NAME": row.get("exec_first_name"),
+                "LAST_NAME": row.get("exec_last_name"),
+                "PHYSICIAN_LEADER": row.get("PHYSICIAN_LEADER"),
+                "BUSINESS_EMAIL": row.get("exec_business_email"),
+                "DIRECT_EMAIL_PRIMARY": row.get("exec_direct_email_primary"),
+                "DIRECT_EMAIL_SECONDARY": row.get("exec_direct_email_secondary"),
+                "MOBILE_PHONE_PRIMARY": row.get("exec_mobile_primary"),
+                "MOBILE_PHONE_SECONDARY": row.get("exec_mobile_secondary"),
+                "physician_group_name": row.get("exec_group_name"),
+                "TITLE": row.get("TITLE"),
+                "LINKEDIN_PROFILE": row.get("LINKEDIN_PROFILE")
+            }
+            if not exec_checked and not has_valid_contact_info(exec_data, "executive"):
+                continue
+            dedupe_key = ("executive", org["definitive_id"], *exec_data.values())
+            if dedupe_key not in seen_contacts:
+                seen_contacts.add(dedupe_key)
+                org["executives"].append(exec_data)
+
     # Sort by similarity score
     scored_orgs.sort(key=lambda x: x["similarity_score"], reverse=True)
     
@@ -2045,6 +3211,8 @@ def find_lookalikes_from_company_data(company_data, similarity_threshold=85, max
     # Prepare full result for caching
     full_result = {
         "source_company": company_data,
+        "expanded_specialties": expanded_specialties,
+        "expansion_complete": expansion_complete,
         "total_matches": len(scored_orgs),
         "similarity_threshold": similarity_threshold,
         "lookalike_organizations": scored_orgs
@@ -2052,22 +3220,9 @@ def find_lookalikes_from_company_data(company_data, similarity_threshold=85, max
     
     # Cache the full result
     if use_cache:
-        set_cached_result(cache_key, full_result)
-    
-    # Apply pagination
-    total_orgs = len(scored_orgs)
-    start_idx = (page - 1) * page_size
-    end_idx = start_idx + page_size
+        set_cached_result(cache_key, full_result, cache_lock_token)
     
-    return {
-        "source_company": company_data,
-        "total_matches": total_orgs,
-        "similarity_threshold": similarity_threshold,
-        "page": page,
-        "page_size": page_size,
-        "total_pages": (total_orgs + page_size - 1) // page_size if total_orgs > 0 else 0,
-        "lookalike_organizations": scored_orgs[start_idx:end_idx]
-    }
+    return _paginate_lookalikes(full_result, page, page_size)
 
 def get_match_reasons(company_data, org_data, score):
     """Generate human-readable match reasons based on tier score"""
@@ -2121,22 +3276,23 @@ def clay_seed():
     - physician_count, ehr, definitive_id, similarity_score
     """
     if not CLAY_WEBHOOK_URL:
-        return jsonify({'error': 'CLAY_WEBHOOK_URL not configured'}), 500
+        return ojsonify({'error': 'CLAY_WEBHOOK_URL not configured'}), 500
 
     data = request.get_json()
     if not data:
-        return jsonify({'error': 'Request body is required'}), 400
+        return ojsonify({'error': 'Request body is required'}), 400
 
     state = data.get('state')
     if not state:
-        return jsonify({'error': 'state is required'}), 400
+        return ojsonify({'error': 'state is required'}), 400
 
     # Pass through all fields from request to Clay webhook
     payload = {k: v for k, v in data.items() if v is not None and v != ''}
 
     print(f"\n{'='*60}", file=sys.stderr)
     print(f"[CLAY SEED] Sending to Clay webhook:", file=sys.stderr)
-    print(f"  {json.dumps(payload, indent=2)}", file=sys.stderr)
+    if DEBUG_PAYLOADS:
+        print(f"  {json.dumps(payload, indent=2)}", file=sys.stderr)
     print(f"{'='*60}\n", file=sys.stderr)
 
     try:
@@ -2147,13 +3303,13 @@ def clay_seed():
             timeout=10
         )
         if resp.status_code in (200, 201, 202):
-            return jsonify({'success': True, 'message': 'Seed sent to Clay'})
+            return ojsonify({'success': True, 'message': 'Seed sent to Clay'})
         else:
-            return jsonify({'error': f'Clay webhook returned {resp.status_code}', 'details': resp.text}), 502
+            return ojsonify({'error': f'Clay webhook returned {resp.status_code}', 'details': resp.text}), 502
     except requests.exceptions.Timeout:
-        return jsonify({'error': 'Clay webhook timed out'}), 504
+        return ojsonify({'error': 'Clay webhook timed out'}), 504
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return ojsonify({'error': str(e)}), 500
 
 
 # ─── Clay Contact Search Endpoints ─────────────────────────────────────────────
@@ -2180,15 +3336,15 @@ def check_clay_search():
     """
     data = request.get_json()
     if not data:
-        return jsonify({'error': 'Request body is required'}), 400
+        return ojsonify({'error': 'Request body is required'}), 400
 
     domain = (data.get('domain') or '').strip()
     if not domain:
-        return jsonify({'error': 'domain is required'}), 400
+        return ojsonify({'error': 'domain is required'}), 400
 
     company_key = get_company_key(domain)
     if not company_key:
-        return jsonify({'error': 'Invalid domain'}), 400
+        return ojsonify({'error': 'Invalid domain'}), 400
 
     print(f"[CLAY CHECK] Checking cache for domain={company_key}", file=sys.stderr)
 
@@ -2197,7 +3353,7 @@ def check_clay_search():
 
     if entry:
         print(f"[CLAY CHECK] Cache HIT — status={entry.get('status')}, contacts={len(entry.get('contacts', []))}", file=sys.stderr)
-        return jsonify({
+        return ojsonify({
             'found': True,
             'company_key': company_key,
             'status': entry.get('status', 'complete'),
@@ -2207,7 +3363,7 @@ def check_clay_search():
         })
     else:
         print(f"[CLAY CHECK] Cache MISS for domain={company_key}", file=sys.stderr)
-        return jsonify({
+        return ojsonify({
             'found': False,
             'company_key': company_key
         })
@@ -2230,19 +3386,19 @@ def trigger_clay_search():
     - force (optional, bool): if true, re-run even if cached results exist
     """
     if not CLAY_WEBHOOK_URL:
-        return jsonify({'error': 'CLAY_WEBHOOK_URL not configured — cannot trigger Clay search'}), 500
+        return ojsonify({'error': 'CLAY_WEBHOOK_URL not configured — cannot trigger Clay search'}), 500
 
     data = request.get_json()
     if not data:
-        return jsonify({'error': 'Request body is required'}), 400
+        return ojsonify({'error': 'Request body is required'}), 400
 
     domain = (data.get('domain') or '').strip()
     if not domain:
-        return jsonify({'error': 'domain is required'}), 400
+        return ojsonify({'error': 'domain is required'}), 400
 
     company_key = get_company_key(domain)
     if not company_key:
-        return jsonify({'error': 'Invalid domain'}), 400
+        return ojsonify({'error': 'Invalid domain'}), 400
 
     company_name = (data.get('company_name') or '').strip()
     state = (data.get('state') or '').strip()
@@ -2255,7 +3411,7 @@ def trigger_clay_search():
         existing = _get_clay_search(company_key)
         if existing and existing.get('status') == 'complete':
             print(f"[CLAY TRIGGER] Already cached for domain={company_key}, returning cached flag", file=sys.stderr)
-            return jsonify({
+            return ojsonify({
                 'already_cached': True,
                 'company_key': company_key,
                 'message': 'Results already cached — use check-clay-search to retrieve'
@@ -2291,7 +3447,8 @@ def trigger_clay_search():
     print(f"\n{'='*60}", file=sys.stderr)
     print(f"[CLAY TRIGGER] Sending search request to Clay webhook:", file=sys.stderr)
     print(f"  company_key (domain): {company_key}", file=sys.stderr)
-    print(f"  payload: {json.dumps(payload, indent=2)}", file=sys.stderr)
+    if DEBUG_PAYLOADS:
+        print(f"  payload: {json.dumps(payload, indent=2)}", file=sys.stderr)
     print(f"{'='*60}\n", file=sys.stderr)
 
     try:
@@ -2302,7 +3459,7 @@ def trigger_clay_search():
             timeout=10
         )
         if resp.status_code in (200, 201, 202):
-            return jsonify({
+            return ojsonify({
                 'success': True,
                 'company_key': company_key,
                 'message': 'Search triggered — poll /api/clay-search-status for results'
@@ -2311,18 +3468,45 @@ def trigger_clay_search():
             # Reset status since Clay didn't accept the request
             cache_entry['status'] = 'error'
             _clay_search_cache[company_key] = cache_entry
-            return jsonify({
+            return ojsonify({
                 'error': f'Clay webhook returned {resp.status_code}',
                 'details': resp.text
             }), 502
     except requests.exceptions.Timeout:
         cache_entry['status'] = 'error'
         _clay_search_cache[company_key] = cache_entry
-        return jsonify({'error': 'Clay webhook timed out'}), 504
+        return ojsonify({'error': 'Clay webhook timed out'}), 504
     except Exception as e:
         cache_entry['status'] = 'error'
         _clay_search_cache[company_key] = cache_entry
-        return jsonify({'error': str(e)}), 500
+        return ojsonify({'error': str(e)}), 500
+
+
+# Map Clay field names → internal field names
+# Clay sends: full_name, title, email, phone, linkedin
+# We store:   name,      title, email, phone, linkedin
+_CLAY_PAIRS = (
+    ('full_name', 'name'),
+    ('title', 'title'),
+    ('email', 'email'),
+    ('phone', 'phone'),
+    ('linkedin', 'linkedin'),
+)
+
+
+def _normalize_clay_contact(raw):
+    """Convert a Clay contact dict to our internal format."""
+    contact = {}
+    for clay_key, internal_key in _CLAY_PAIRS:
+        val = raw.get(clay_key)
+        if val and (val := val.strip() if isinstance(val, str) else str(val).strip()):
+            contact[internal_key] = val
+    # Also accept our internal 'name' in case of direct API calls (full_name wins)
+    if 'name' not in contact:
+        val = raw.get('name')
+        if val and (val := val.strip() if isinstance(val, str) else str(val).strip()):
+            contact['name'] = val
+    return contact
 
 
 @flask_app.route('/api/clay-contact-result', methods=['POST'])
@@ -2349,96 +3533,75 @@ def clay_contact_result():
     """
     data = request.get_json()
     if not data:
-        return jsonify({'error': 'Request body is required'}), 400
+        return ojsonify({'error': 'Request body is required'}), 400
 
     raw_key = (data.get('company_key') or '').strip()
     if not raw_key:
-        return jsonify({'error': 'company_key (domain) is required'}), 400
+        return ojsonify({'error': 'company_key (domain) is required'}), 400
 
     # Normalize the domain key in case Clay passes it back slightly differently
     company_key = get_company_key(raw_key)
 
     print(f"\n{'='*60}", file=sys.stderr)
     print(f"[CLAY CALLBACK] Received contact data for domain={company_key}", file=sys.stderr)
-    print(f"  Raw payload: {json.dumps(data, indent=2, default=str)}", file=sys.stderr)
+    if DEBUG_PAYLOADS:
+        print(f"  Raw payload: {json.dumps(data, indent=2, default=str)}", file=sys.stderr)
     print(f"{'='*60}\n", file=sys.stderr)
 
-    # Map Clay field names → internal field names
-    # Clay sends: full_name, title, email, phone, linkedin
-    # We store:   name,      title, email, phone, linkedin
-    CLAY_FIELD_MAP = {
-        'full_name': 'name',
-        'title': 'title',
-        'email': 'email',
-        'phone': 'phone',
-        'linkedin': 'linkedin',
-        # Also accept our internal names in case of direct API calls
-        'name': 'name',
-    }
-
-    def _normalize_contact(raw):
-        """Convert a Clay contact dict to our internal format."""
-        contact = {}
-        for clay_key, internal_key in CLAY_FIELD_MAP.items():
-            val = raw.get(clay_key)
-            if val and str(val).strip():
-                # Don't overwrite if we already have this field (name vs full_name)
-                if internal_key not in contact:
-                    contact[internal_key] = str(val).strip()
-        return contact
-
     # Parse contacts — Clay sends one row per webhook call (single-contact format)
     incoming_contacts = []
     if 'contacts' in data and isinstance(data['contacts'], list):
         # Batch format (rare): { company_key, contacts: [...] }
         for raw in data['contacts']:
-            c = _normalize_contact(raw)
+            c = _normalize_clay_contact(raw)
             if c:
                 incoming_contacts.append(c)
     else:
         # Single-contact format (standard Clay row): { company_key, full_name, title, ... }
-        c = _normalize_contact(data)
+        c = _normalize_clay_contact(data)
         if c:
             incoming_contacts = [c]
 
     if not incoming_contacts:
         print(f"[CLAY CALLBACK] No contacts in payload for domain={company_key}", file=sys.stderr)
         # Still mark as complete even with 0 contacts (Clay found nothing)
-        entry = _get_clay_search(company_key)
-        if entry:
+        def _mark_complete(entry):
+            if not entry:
+                return None
             entry['status'] = 'complete'
-            _clay_search_cache[company_key] = entry
-            _save_clay_cache_to_redis(company_key, entry)
-        return jsonify({'success': True, 'contact_count': 0, 'message': 'No contacts in payload'})
-
-    # Get or create cache entry
-    entry = _get_clay_search(company_key)
-    if not entry:
-        # Edge case: callback arrived but we don't have a cache entry
-        # (e.g., server restarted, or different worker without Redis)
-        print(f"[CLAY CALLBACK] No cache entry for domain={company_key} — creating new entry", file=sys.stderr)
-        entry = {
-            'domain': company_key,
-            'company_name': data.get('company_name', ''),
-            'searched_at': datetime.utcnow().isoformat(),
-            'status': 'searching',
-            'contacts': []
-        }
-
-    # Deduplicate and merge new contacts with existing ones
-    existing_contacts = entry.get('contacts', [])
-    merged_contacts = _deduplicate_contacts(existing_contacts, incoming_contacts)
-
-    new_count = len(merged_contacts) - len(existing_contacts)
-    print(f"[CLAY CALLBACK] Merged: {len(existing_contacts)} existing + {new_count} new = {len(merged_contacts)} total", file=sys.stderr)
+            return entry
+
+        _update_clay_search(company_key, _mark_complete)
+        return ojsonify({'success': True, 'contact_count': 0, 'message': 'No contacts in payload'})
+
+    counts = {}
+
+    def _merge(entry):
+        if not entry:
+            # Edge case: callback arrived but we don't have a cache entry
+            # (e.g., server restarted, or different worker without Redis)
+            print(f"[CLAY CALLBACK] No cache entry for domain={company_key} — creating new entry", file=sys.stderr)
+            entry = {
+                'domain': company_key,
+                'company_name': data.get('company_name', ''),
+                'searched_at': datetime.utcnow().isoformat(),
+                'status': 'searching',
+                'contacts': []
+            }
+        # Deduplicate and merge new contacts with existing ones
+        existing_contacts = entry.get('contacts', [])
+        entry['contacts'] = _deduplicate_contacts(existing_contacts, incoming_contacts)
+        entry['status'] = 'complete'
+        counts['existing'] = len(existing_contacts)
+        return entry
 
-    # Update cache entry
-    entry['contacts'] = merged_contacts
-    entry['status'] = 'complete'
-    _clay_search_cache[company_key] = entry
-    _save_clay_cache_to_redis(company_key, entry)
+    # Merge and persist before replying so status pollers on any worker see the new contacts
+    entry = _update_clay_search(company_key, _merge)
+    merged_contacts = entry['contacts']
+    new_count = len(merged_contacts) - counts['existing']
+    print(f"[CLAY CALLBACK] Merged: {counts['existing']} existing + {new_count} new = {len(merged_contacts)} total", file=sys.stderr)
 
-    return jsonify({
+    return ojsonify({
         'success': True,
         'contact_count': len(merged_contacts),
         'new_contacts': new_count,
@@ -2467,13 +3630,13 @@ def clay_search_status(company_key):
     entry = _get_clay_search(company_key)
 
     if not entry:
-        return jsonify({
+        return ojsonify({
             'found': False,
             'status': 'not_found',
             'message': 'No search found for this domain'
         }), 404
 
-    return jsonify({
+    return ojsonify({
         'found': True,
         'status': entry.get('status', 'searching'),
         'searched_at': entry.get('searched_at'),
@@ -2482,6 +3645,102 @@ def clay_search_status(company_key):
     })
 
 
+# Contact dicts from find_lookalikes_from_company_data and the get_organization_contacts
+# lookups always carry every key, so each contact type's fields are read in one itemgetter call
+_PHYSICIAN_CONTACT_FIELDS = itemgetter(
+    'FIRST_NAME', 'LAST_NAME', 'BUSINESS_EMAIL', 'DIRECT_EMAIL_PRIMARY', 'DIRECT_EMAIL_SECONDARY',
+    'MOBILE_PHONE_PRIMARY', 'MOBILE_PHONE_SECONDARY', 'PRIMARY_SPECIALTY',
+)
+_EXECUTIVE_CONTACT_FIELDS = itemgetter(
+    'FIRST_NAME', 'LAST_NAME', 'BUSINESS_EMAIL', 'DIRECT_EMAIL_PRIMARY', 'DIRECT_EMAIL_SECONDARY',
+    'MOBILE_PHONE_PRIMARY', 'MOBILE_PHONE_SECONDARY', 'TITLE', 'LINKEDIN_PROFILE',
+)
+
+
+def format_contact(c, contact_type):
+    """Map raw contact dict to clean frontend fields with all available contact info."""
+    if contact_type == 'physician':
+        first, last, business, direct1, direct2, mobile1, mobile2, title = _PHYSICIAN_CONTACT_FIELDS(c)
+    else:
+        first, last, business, direct1, direct2, mobile1, mobile2, title, linkedin = _EXECUTIVE_CONTACT_FIELDS(c)
+    entry = {
+        'name': f"{first} {last}".strip(),
+        'type': contact_type,
+        'business_email': business or None,
+        'direct_email_primary': direct1 or None,
+        'direct_email_secondary': direct2 or None,
+        'mobile_phone_primary': mobile1 or None,
+        'mobile_phone_secondary': mobile2 or None,
+        'title': title,
+    }
+    if contact_type != 'physician':
+        entry['linkedin'] = linkedin or None
+    return entry
+
+
+def format_lookalike_org(org):
+    """Map a scored Definitive org (with physicians/executives) to the /api/lookalikes shape."""
+    contacts = []
+    for p in org.get('physicians', []):
+        contacts.append(format_contact(p, 'physician'))
+    for e in org.get('executives', []):
+        contacts.append(format_contact(e, 'executive'))
+
+    return {
+        'name': org.get('physician_group_name'),
+        'city': org.get('city'),
+        'state': org.get('state'),
+        'country': 'United States',
+        'specialty': org.get('combined_main_specialty'),
+        'physician_count': org.get('physician_count'),
+        'similarity_score': org.get('similarity_score'),
+        'match_reasons': org.get('match_reasons'),
+        'definitive_id': org.get('definitive_id'),
+        'ehr': org.get('ambulatory_emr'),
+        'website': org.get('website'),
+        'hs_id': org.get('hs_id'),
+        'contacts': contacts,
+    }
+
+
+def attach_lookalike_contacts(orgs, loaded_ids):
+    """
+    Fill in 'contacts' for formatted lookalike orgs not yet in loaded_ids, keeping
+    only reachable contacts (has_valid_contact_info). The orgs are the cached
+    projection's dicts, so a page's contacts are fetched once per search, with
+    one bulk lookup for the whole page.
+    """
+    pending = [org for org in orgs
+               if org.get('definitive_id') is not None and org['definitive_id'] not in loaded_ids]
+    if not pending:
+        return
+    found_by_id = get_organization_contacts_bulk([org['definitive_id'] for org in pending])
+    if found_by_id is None:
+        return
+    for org in pending:
+        def_id = org['definitive_id']
+        found = found_by_id.get(def_id, {"physicians": [], "executives": []})
+        # Repeated source rows collapse to one contact, as in the lookalike join
+        contacts = {}
+        for p in found['physicians']:
+            if has_valid_contact_info(p, 'physician'):
+                entry = format_contact(p, 'physician')
+                contacts.setdefault(tuple(entry.values()), entry)
+        for e in found['executives']:
+            if has_valid_contact_info(e, 'executive'):
+                entry = format_contact(e, 'executive')
+                contacts.setdefault(tuple(entry.values()), entry)
+        org['contacts'] = list(contacts.values())
+        loaded_ids.add(def_id)
+
+
+# Formatted lookalike results per deal search, shared across page/filter navigation.
+# Keyed by (billing_state, billing_city, specialty) -> (timestamp, projection)
+_lookalike_page_cache = {}
+_lookalike_page_ttl = 600  # 10 minutes
+LOOKALIKES_MAX_PAGE_SIZE = 100
+
+
 @flask_app.route('/api/lookalikes', methods=['GET'])
 @require_auth
 def get_lookalikes():
@@ -2498,6 +3757,8 @@ def get_lookalikes():
     - filter_min_match: minimum match % (e.g. 85)
     - filter_city: filter results to this city
     - filter_state: filter results to this state
+    - fields: comma-separated subset of lookalikes, expanded_specialties,
+      filter_options to return (default: all); counts and paging are always returned
     """
     billing_state = request.args.get('billing_state')
     billing_city = request.args.get('billing_city')
@@ -2511,8 +3772,16 @@ def get_lookalikes():
     filter_city = request.args.get('filter_city', '').strip()
     filter_state = request.args.get('filter_state', '').strip()
 
+    # Heavy response keys the caller asked for; None means all of them
+    fields = request.args.get('fields', '').strip()
+    wanted = {f.strip() for f in fields.split(',') if f.strip()} if fields else None
+
     if not billing_state:
-        return jsonify({'error': 'billing_state is required'}), 400
+        return ojsonify({'error': 'billing_state is required'}), 400
+    if page < 1:
+        return ojsonify({'error': 'page must be >= 1'}), 400
+    if not 1 <= page_size <= LOOKALIKES_MAX_PAGE_SIZE:
+        return ojsonify({'error': f'page_size must be between 1 and {LOOKALIKES_MAX_PAGE_SIZE}'}), 400
 
     company_data = {
         'billing_state': billing_state,
@@ -2527,120 +3796,164 @@ def get_lookalikes():
     print(f"  billing_state = {repr(billing_state)}", file=sys.stderr)
     print(f"  billing_city  = {repr(billing_city)}", file=sys.stderr)
     print(f"  specialty     = {repr(specialty)}", file=sys.stderr)
-    print(f"[LOOKALIKES] company_data being passed to find_lookalikes_from_company_data:", file=sys.stderr)
-    print(f"  {json.dumps(company_data, indent=2)}", file=sys.stderr)
+    if DEBUG_PAYLOADS:
+        print(f"[LOOKALIKES] company_data being passed to find_lookalikes_from_company_data:", file=sys.stderr)
+        print(f"  {json.dumps(company_data, indent=2)}", file=sys.stderr)
     print(f"{'='*60}\n", file=sys.stderr)
 
-    # Fetch ALL results (page=1, page_size=99999) so we can filter + paginate server-side
-    result = find_lookalikes_from_company_data(
-        company_data,
-        similarity_threshold=85,
-        include_contacts=True,
-        page=1,
-        page_size=99999,
-        use_cache=True
-    )
+    # Page and filter navigation re-requests the same search; reuse the formatted
+    # projection so neither the Databricks query nor the format pass is repeated.
+    page_cache_key = (billing_state or '', billing_city or '', specialty or '')
+    cached_page = _lookalike_page_cache.get(page_cache_key)
+    if cached_page and time.time() - cached_page[0] < _lookalike_page_ttl:
+        projection = cached_page[1]
+    else:
+        # Fetch ALL results (page=1, page_size=99999) so we can filter + paginate server-side.
+        # Contacts are fetched later, only for the orgs on the page being returned.
+        result = find_lookalikes_from_company_data(
+            company_data,
+            similarity_threshold=85,
+            include_contacts=False,
+            page=1,
+            page_size=99999,
+            use_cache=True
+        )
 
-    if 'error' in result:
-        return jsonify(result), 400
-
-    def format_contact(c, contact_type):
-        """Map raw contact dict to clean frontend fields with all available contact info."""
-        entry = {
-            'name': f"{c.get('FIRST_NAME', '')} {c.get('LAST_NAME', '')}".strip(),
-            'type': contact_type,
-            'business_email': c.get('BUSINESS_EMAIL') or None,
-            'direct_email_primary': c.get('DIRECT_EMAIL_PRIMARY') or None,
-            'direct_email_secondary': c.get('DIRECT_EMAIL_SECONDARY') or None,
-            'mobile_phone_primary': c.get('MOBILE_PHONE_PRIMARY') or None,
-            'mobile_phone_secondary': c.get('MOBILE_PHONE_SECONDARY') or None,
+        if 'error' in result:
+            return ojsonify(result), 400
+
+        expanded_specialties = result.get('expanded_specialties', [])
+
+        # One pass over the raw orgs: format each, group by state (so filter_state
+        # is a dict lookup) and collect filter options from the FULL unfiltered set.
+        formatted = []
+        by_state = defaultdict(list)
+        by_city = defaultdict(list)
+        by_specialty = defaultdict(list)
+        all_specialties_set = set()
+        all_cities_set = set()
+        all_states_set = set()
+        for idx, raw_org in enumerate(result.get('lookalike_organizations', [])):
+            org = format_lookalike_org(raw_org)
+            formatted.append(org)
+            spec = org.get('specialty')
+            if spec:
+                all_specialties_set.add(spec)
+            city = org.get('city')
+            if city:
+                all_cities_set.add(city)
+            st = org.get('state')
+            if st:
+                all_states_set.add(st)
+            # Inverted indexes on the normalized filter values -> row positions
+            by_state[(st or '').upper()].append(idx)
+            by_city[(city or '').lower()].append(idx)
+            by_specialty[(spec or '').lower()].append(idx)
+        # Also include LLM-expanded specialties as filterable options
+        all_specialties_set.update(expanded_specialties)
+        projection = {
+            'lookalikes': formatted,
+            # definitive_ids whose page contacts have been attached to their org
+            'contacts_loaded': set(),
+            'by_state': dict(by_state),
+            'by_city': dict(by_city),
+            'by_specialty': dict(by_specialty),
+            'scores': np.fromiter(
+                (o.get('similarity_score') or 0 for o in formatted),
+                dtype=np.int16, count=len(formatted)
+            ),
+            'expanded_specialties': expanded_specialties,
+            'filter_options': {
+                'specialties': sorted(all_specialties_set),
+                'cities': sorted(all_cities_set),
+                'states': sorted(all_states_set),
+            },
         }
-        if contact_type == 'physician':
-            entry['title'] = c.get('PRIMARY_SPECIALTY')
-        else:
-            entry['title'] = c.get('TITLE')
-            entry['linkedin'] = c.get('LINKEDIN_PROFILE') or None
-        return entry
-
-    # Map ALL results to frontend-friendly format
-    all_lookalikes = []
-    for org in result.get('lookalike_organizations', []):
-        contacts = []
-        for p in org.get('physicians', []):
-            contacts.append(format_contact(p, 'physician'))
-        for e in org.get('executives', []):
-            contacts.append(format_contact(e, 'executive'))
-
-        all_lookalikes.append({
-            'name': org.get('physician_group_name'),
-            'city': org.get('city'),
-            'state': org.get('state'),
-            'country': 'United States',
-            'specialty': org.get('combined_main_specialty'),
-            'physician_count': org.get('physician_count'),
-            'similarity_score': org.get('similarity_score'),
-            'match_reasons': org.get('match_reasons'),
-            'definitive_id': org.get('definitive_id'),
-            'ehr': org.get('ambulatory_emr'),
-            'website': org.get('website'),
-            'hs_id': org.get('hs_id'),
-            'contacts': contacts,
-        })
-
-    # Build filter options from the FULL unfiltered set (including expanded specialties)
-    expanded_specialties = company_data.get('_expanded_specialties', [])
-    all_specialties_set = set()
-    all_cities_set = set()
-    all_states_set = set()
-    for org in all_lookalikes:
-        if org.get('specialty'):
-            all_specialties_set.add(org['specialty'])
-        if org.get('city'):
-            all_cities_set.add(org['city'])
-        if org.get('state'):
-            all_states_set.add(org['state'])
-    # Also include LLM-expanded specialties as filterable options
-    for spec in expanded_specialties:
-        all_specialties_set.add(spec)
-
-    filter_options = {
-        'specialties': sorted(all_specialties_set),
-        'cities': sorted(all_cities_set),
-        'states': sorted(all_states_set),
-    }
-
-    # Apply filters to the full set
-    filtered = all_lookalikes
-    if filter_specialty:
-        filtered = [o for o in filtered if o.get('specialty', '').lower() == filter_specialty.lower()]
+        now = time.time()
+        # Drop expired searches so the cache doesn't grow for the life of the worker
+        for stale_key in [k for k, (ts, _) in _lookalike_page_cache.items() if now - ts >= _lookalike_page_ttl]:
+            del _lookalike_page_cache[stale_key]
+        # The key has no expansions in it, so a search run without a timed-out
+        # expansion is served once but not kept as this deal's answer
+        if result.get('expansion_complete', True):
+            _lookalike_page_cache[page_cache_key] = (now, projection)
+
+    all_lookalikes = projection['lookalikes']
+    expanded_specialties = projection['expanded_specialties']
+    filter_options = projection['filter_options']
+
+    # Parse min-match once; invalid values are ignored like before
+    min_val = None
     if filter_min_match:
         try:
             min_val = int(filter_min_match)
-            filtered = [o for o in filtered if (o.get('similarity_score') or 0) >= min_val]
         except ValueError:
             pass
-    if filter_city:
-        filtered = [o for o in filtered if o.get('city', '').lower() == filter_city.lower()]
+
+    # Apply filters to the full set. Equality filters are lookups in the inverted
+    # indexes built with the projection; the rarest one drives the intersection.
+    index_lists = []
     if filter_state:
-        filtered = [o for o in filtered if o.get('state', '').upper() == filter_state.upper()]
+        index_lists.append(projection['by_state'].get(filter_state.upper(), []))
+    if filter_city:
+        index_lists.append(projection['by_city'].get(filter_city.lower(), []))
+    if filter_specialty:
+        index_lists.append(projection['by_specialty'].get(filter_specialty.lower(), []))
+
+    rows = None
+    if index_lists:
+        index_lists.sort(key=len)
+        rows = index_lists[0]
+        for other in index_lists[1:]:
+            if not rows:
+                break
+            keep = set(other)
+            rows = [i for i in rows if i in keep]
+
+    filtered = None
+    if min_val is not None:
+        scores = projection['scores']
+        # Scores are 0-100 int16; clamp so any user value compares safely in that dtype
+        min_val = max(-1, min(min_val, 101))
+        if rows is None:
+            # Lookalikes come back sorted by score descending, so the orgs at or
+            # above min_val are a prefix; binary-search its length on the
+            # ascending (reversed view) scores instead of scanning them all
+            below = int(np.searchsorted(scores[::-1], min_val, side='left'))
+            filtered = all_lookalikes[:len(all_lookalikes) - below]
+        elif rows:
+            # Gather the candidates' scores and compare them in one vectorized step
+            rows = np.asarray(rows)
+            rows = rows[scores[rows] >= min_val]
+
+    if filtered is None:
+        filtered = all_lookalikes if rows is None else [all_lookalikes[i] for i in rows]
 
     # Paginate the filtered results
     total_filtered = len(filtered)
-    total_pages = (total_filtered + page_size - 1) // page_size if total_filtered > 0 else 0
+    total_pages = -(-total_filtered // page_size)  # ceil; 0 when nothing matched (page_size >= 1 is validated above)
     start_idx = (page - 1) * page_size
-    end_idx = start_idx + page_size
-    page_results = filtered[start_idx:end_idx]
 
-    return jsonify({
-        'lookalikes': page_results,
+    response = {
         'total_matches': total_filtered,
         'total_unfiltered': len(all_lookalikes),
         'page': page,
         'page_size': page_size,
         'total_pages': total_pages,
-        'expanded_specialties': expanded_specialties,
-        'filter_options': filter_options,
-    })
+    }
+    if wanted is None or 'lookalikes' in wanted:
+        if start_idx >= total_filtered:
+            # Past the last page (or no matches): nothing to slice or enrich
+            page_results = []
+        else:
+            page_results = filtered[start_idx:start_idx + page_size]
+            attach_lookalike_contacts(page_results, projection['contacts_loaded'])
+        response['lookalikes'] = page_results
+    if wanted is None or 'expanded_specialties' in wanted:
+        response['expanded_specialties'] = expanded_specialties
+    if wanted is None or 'filter_options' in wanted:
+        response['filter_options'] = filter_options
+    return ojsonify(response)
 
 # Tell Claude what tools are available
 @app.list_tools()
@@ -2720,7 +4033,7 @@ async def list_tools() -> list[Tool]:
         ),
         Tool(
             name="query_databricks",
-            description="Run custom SQL on Databricks (SELECT only)",
+            description="Run custom SQL on Databricks (single SELECT, WITH, SHOW or DESCRIBE statement)",
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -2808,175 +4121,258 @@ async def list_tools() -> list[Tool]:
         )
     ]
 
-# Tool implementations
-@app.call_tool()
-async def call_tool(name: str, arguments: dict) -> list[TextContent]:
+# Blocking bodies of the Databricks tools, run off the event loop by call_tool.
+# They borrow warm sessions from db_pool like the dashboard routes do, instead of
+# paying a fresh TLS + auth handshake on every tool call.
+def _describe_databricks_table(table_name):
+    with db_pool.acquire() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"DESCRIBE {table_name}")
+        schema = [{"column": row[0], "type": row[1], "comment": row[2] if len(row) > 2 else None} for row in _iter_rows(cursor)]
+        cursor.close()
+    return schema
+
+
+def _query_databricks_dicts(query, params=None):
+    with db_pool.acquire() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        rows = _fetch_dicts(cursor)
+        cursor.close()
+    return rows
+
+
+# String literals, quoted identifiers and comments are blanked before keyword checks
+# so their contents can't hide or fake a statement boundary or keyword
+_SQL_NOISE_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`|--[^\n]*|/\*.*?\*/", re.S)
+_SQL_READ_KEYWORDS = ('SELECT', 'WITH', 'SHOW', 'DESCRIBE', 'DESC')
+# Rejected anywhere in a SELECT/WITH query: Databricks accepts e.g.
+# WITH ... INSERT INTO / INSERT OVERWRITE and FROM t INSERT ..., so a read-only
+# leading keyword alone doesn't make the statement read-only. Quote an identifier
+# with backticks if it really is one of these words.
+_SQL_WRITE_KEYWORDS = frozenset({
+    'INSERT', 'UPDATE', 'DELETE', 'MERGE', 'CREATE', 'DROP', 'ALTER', 'TRUNCATE', 'OVERWRITE',
+})
+_SQL_TOKEN_RE = re.compile(r"[A-Za-z_][A-Za-z_0-9]*|[(),]")
+
+
+def _leading_sql_keyword(query):
+    """First keyword of a statement, upper-cased, ignoring leading comments ('' if none)."""
+    match = re.match(r'\s*([A-Za-z]+)', _SQL_NOISE_RE.sub(' ', query))
+    return match.group(1).upper() if match else ''
+
+
+def _cte_main_keyword(tokens):
+    """
+    For WITH-query tokens, the first token of the statement after the CTE list
+    (upper-cased), or '' if there is none. Each CTE is `name [(cols)] AS (...)`
+    separated by commas, so the main statement starts at the first depth-0 token
+    after a closing parenthesis that is neither a comma nor AS.
+    """
+    depth = 0
+    after_close = False
+    for tok in tokens[1:]:
+        if tok == '(':
+            if after_close:
+                return '('  # parenthesized main query
+            depth += 1
+        elif tok == ')':
+            depth -= 1
+            after_close = depth == 0
+        elif depth == 0:
+            if after_close and tok != ',' and tok.upper() != 'AS':
+                return tok.upper()
+            after_close = False
+    return ''
+
+
+def _read_only_select(query):
+    """
+    The query with any trailing semicolon removed if it is a single read-only
+    statement, else None. SHOW/DESCRIBE pass as is; a SELECT, or a WITH whose
+    main statement is a SELECT, must not contain any write keyword.
+    """
+    query = query.strip().rstrip(';').rstrip()
+    code = _SQL_NOISE_RE.sub(' ', query)
+    if ';' in code:
+        return None  # more than one statement
+    first = _leading_sql_keyword(query)
+    if first not in _SQL_READ_KEYWORDS:
+        return None
+    if first in ('SELECT', 'WITH'):
+        tokens = _SQL_TOKEN_RE.findall(code)
+        if _SQL_WRITE_KEYWORDS.intersection(tok.upper() for tok in tokens):
+            return None
+        if first == 'WITH' and _cte_main_keyword(tokens) not in ('SELECT', '('):
+            return None
+    return query
+
+
+# Tool implementations. Every tool does blocking HTTP / Databricks / LLM work, so
+# it runs in a worker thread (asyncio.to_thread) instead of stalling the MCP
+# event loop for the whole call.
+
+# ========== HUBSPOT ==========
+async def _tool_search_hubspot_deals(arguments):
+    deals = await asyncio.to_thread(
+        search_hubspot_deals,
+        deal_stage=arguments.get("deal_stage"),
+        is_closed_won=arguments.get("is_closed_won"),
+        country=arguments.get("country"),
+        state=arguments.get("state"),
+        city=arguments.get("city"),
+        specialty=arguments.get("specialty"),
+        pipeline=arguments.get("pipeline"),
+        min_seats=arguments.get("min_seats"),
+        max_seats=arguments.get("max_seats"),
+        min_tso=arguments.get("min_tso"),
+        max_tso=arguments.get("max_tso"),
+        min_amount=arguments.get("min_amount"),
+        max_amount=arguments.get("max_amount"),
+        days_back=arguments.get("days_back"),
+        limit=arguments.get("limit", 50)
+    )
     
-    # ========== HUBSPOT ==========
-    if name == "search_hubspot_deals":
-        try:
-            deals = search_hubspot_deals(
-                deal_stage=arguments.get("deal_stage"),
-                is_closed_won=arguments.get("is_closed_won"),
-                country=arguments.get("country"),
-                state=arguments.get("state"),
-                city=arguments.get("city"),
-                specialty=arguments.get("specialty"),
-                pipeline=arguments.get("pipeline"),
-                min_seats=arguments.get("min_seats"),
-                max_seats=arguments.get("max_seats"),
-                min_tso=arguments.get("min_tso"),
-                max_tso=arguments.get("max_tso"),
-                min_amount=arguments.get("min_amount"),
-                max_amount=arguments.get("max_amount"),
-                days_back=arguments.get("days_back"),
-                limit=arguments.get("limit", 50)
-            )
-            
-            return [TextContent(
-                type="text",
-                text=json.dumps({
-                    "total": len(deals),
-                    "deals": deals
-                }, indent=2, default=str)
-            )]
-        except Exception as e:
-            return [TextContent(type="text", text=f"Error: {str(e)}")]
+    return [TextContent(
+        type="text",
+        text=tool_json({
+            "total": len(deals),
+            "deals": deals
+        })
+    )]
+
+
+# ========== NEW ORGANIZATION SEARCH ==========
+async def _tool_get_organizations_from_definitive(arguments):
+    company_name = arguments.get("company_name")
+    state = arguments.get("state")
+    city = arguments.get("city")
+    limit = arguments.get("limit", 10)
     
-    # ========== NEW ORGANIZATION SEARCH ==========
-    elif name == "get_organizations_from_definitive":
-        try:
-            company_name = arguments.get("company_name")
-            state = arguments.get("state")
-            city = arguments.get("city")
-            limit = arguments.get("limit", 10)
-            
-            organizations = get_organizations_from_definitive(company_name, state, city, limit)
-            
-            return [TextContent(
-                type="text", 
-                text=json.dumps({
-                    "total": len(organizations), 
-                    "organizations": organizations
-                }, indent=2, default=str)
-            )]
-        except Exception as e:
-            return [TextContent(type="text", text=f"Error: {str(e)}")]
+    organizations = await asyncio.to_thread(get_organizations_from_definitive, company_name, state, city, limit)
     
-    # ========== UPDATED CONTACT SEARCH BY ID ==========
-    elif name == "get_organization_contacts_by_id":
-        try:
-            definitive_id = arguments.get("definitive_id")
-            contact_type = arguments.get("contact_type", "both")
-            limit = arguments.get("limit", 50)
-            
-            contacts = get_organization_contacts(definitive_id, contact_type, limit)
-            
-            return [TextContent(
-                type="text",
-                text=json.dumps({
-                    "definitive_id": definitive_id,
-                    "contact_type": contact_type,
-                    "physician_count": len(contacts.get("physicians", [])),
-                    "executive_count": len(contacts.get("executives", [])),
-                    "contacts": contacts
-                }, indent=2, default=str)
-            )]
-        except Exception as e:
-            return [TextContent(type="text", text=f"Error: {str(e)}")]
+    return [TextContent(
+        type="text", 
+        text=tool_json({
+            "total": len(organizations), 
+            "organizations": organizations
+        })
+    )]
+
+
+# ========== UPDATED CONTACT SEARCH BY ID ==========
+async def _tool_get_organization_contacts_by_id(arguments):
+    definitive_id = arguments.get("definitive_id")
+    contact_type = arguments.get("contact_type", "both")
+    limit = arguments.get("limit", 50)
     
-    # ========== DATABRICKS ==========
-    elif name == "get_databricks_table_schema":
-        try:
-            table_name = arguments.get("table_name")
-            conn = get_databricks_connection()
-            cursor = conn.cursor()
-            cursor.execute(f"DESCRIBE {table_name}")
-            results = cursor.fetchall()
-            schema = [{"column": row[0], "type": row[1], "comment": row[2] if len(row) > 2 else None} for row in results]
-            cursor.close()
-            conn.close()
-            return [TextContent(type="text", text=json.dumps({"table": table_name, "columns": schema}, indent=2))]
-        except Exception as e:
-            return [TextContent(type="text", text=f"Error: {str(e)}")]
+    contacts = await asyncio.to_thread(get_organization_contacts, definitive_id, contact_type, limit)
     
-    elif name == "search_healthcare_providers":
-        try:
-            specialty = arguments.get("specialty")
-            state = arguments.get("state")
-            city = arguments.get("city")
-            limit = arguments.get("limit", 20)
-            
-            query = "SELECT * FROM prod_analytics_global.exposure.sales__definitive_physician_companies WHERE 1=1"
-            if specialty:
-                query += f" AND LOWER(combined_main_specialty) LIKE LOWER('%{specialty}%')"
-            if state:
-                query += f" AND UPPER(state) = '{state.upper()}'"
-            if city:
-                query += f" AND LOWER(city) LIKE LOWER('%{city}%')"
-            query += f" LIMIT {limit}"
-            
-            conn = get_databricks_connection()
-            cursor = conn.cursor()
-            cursor.execute(query)
-            results = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]
-            providers = [dict(zip(columns, row)) for row in results]
-            cursor.close()
-            conn.close()
-            
-            return [TextContent(type="text", text=json.dumps({"total": len(providers), "providers": providers}, indent=2, default=str))]
-        except Exception as e:
-            return [TextContent(type="text", text=f"Error: {str(e)}")]
+    return [TextContent(
+        type="text",
+        text=tool_json({
+            "definitive_id": definitive_id,
+            "contact_type": contact_type,
+            "physician_count": len(contacts.get("physicians", [])),
+            "executive_count": len(contacts.get("executives", [])),
+            "contacts": contacts
+        })
+    )]
+
+
+# ========== DATABRICKS ==========
+async def _tool_get_databricks_table_schema(arguments):
+    table_name = arguments.get("table_name")
+    schema = await asyncio.to_thread(_describe_databricks_table, table_name)
+    return [TextContent(type="text", text=tool_json({"table": table_name, "columns": schema}))]
+
+
+async def _tool_search_healthcare_providers(arguments):
+    specialty = arguments.get("specialty")
+    state = arguments.get("state")
+    city = arguments.get("city")
+    limit = arguments.get("limit", 20)
     
-    elif name == "query_databricks":
-        try:
-            query = arguments.get("query")
-            limit = arguments.get("limit", 50)
-            
-            if not query.strip().upper().startswith("SELECT"):
-                return [TextContent(type="text", text="Error: Only SELECT queries allowed")]
-            if "LIMIT" not in query.upper():
-                query = f"{query} LIMIT {limit}"
-            
-            conn = get_databricks_connection()
-            cursor = conn.cursor()
-            cursor.execute(query)
-            results = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]
-            data = [dict(zip(columns, row)) for row in results]
-            cursor.close()
-            conn.close()
-            
-            return [TextContent(type="text", text=json.dumps({"rows": len(data), "data": data}, indent=2, default=str))]
-        except Exception as e:
-            return [TextContent(type="text", text=f"Error: {str(e)}")]
+    # Only the filters given are added, so each combination is its own stable,
+    # fully bound statement; ILIKE leaves the columns bare instead of LOWER()ing them
+    query = "SELECT * FROM prod_analytics_global.exposure.sales__definitive_physician_companies WHERE 1=1"
+    params = []
+    if specialty:
+        query += " AND combined_main_specialty ILIKE ?"
+        params.append(f"%{specialty}%")
+    if state:
+        query += " AND UPPER(state) = ?"
+        params.append(state.upper())
+    if city:
+        query += " AND city ILIKE ?"
+        params.append(f"%{city}%")
+    query += " LIMIT ?"
+    params.append(limit)
     
-    # ========== LOOKALIKE ANALYSIS ==========
-    elif name == "find_lookalikes_from_company_data":
-        try:
-            company_data = arguments.get("company_data", {})
-            similarity_threshold = arguments.get("similarity_threshold", 85)  # Default to 85% for high-quality matches
-            max_results = arguments.get("max_results", None)  # None = unlimited
-            include_contacts = arguments.get("include_contacts", True)
-            page = arguments.get("page", 1)
-            page_size = arguments.get("page_size", 10)
-            use_cache = arguments.get("use_cache", True)
-            
-            result = find_lookalikes_from_company_data(
-                company_data, 
-                similarity_threshold, 
-                max_results, 
-                include_contacts,
-                page,
-                page_size,
-                use_cache
-            )
-            return [TextContent(type="text", text=json.dumps(result, indent=2, default=str))]
-        except Exception as e:
-            return [TextContent(type="text", text=f"Error: {str(e)}")]
+    providers = await asyncio.to_thread(_query_databricks_dicts, query, params)
+    
+    return [TextContent(type="text", text=tool_json({"total": len(providers), "providers": providers}))]
+
+
+async def _tool_query_databricks(arguments):
+    query = _read_only_select(arguments.get("query") or "")
+    limit = arguments.get("limit", 50)
+    
+    if query is None:
+        return [TextContent(type="text", text="Error: Only single SELECT, WITH, SHOW or DESCRIBE queries allowed")]
+    # SHOW/DESCRIBE don't take a LIMIT clause
+    if _leading_sql_keyword(query) in ('SELECT', 'WITH') and "LIMIT" not in query.upper():
+        query = f"{query}\nLIMIT {limit}"  # own line, so a trailing -- comment cannot swallow it
+    
+    data = await asyncio.to_thread(_query_databricks_dicts, query)
+    
+    return [TextContent(type="text", text=tool_json({"rows": len(data), "data": data}))]
+
+
+# ========== LOOKALIKE ANALYSIS ==========
+async def _tool_find_lookalikes_from_company_data(arguments):
+    company_data = arguments.get("company_data", {})
+    similarity_threshold = arguments.get("similarity_threshold", 85)  # Default to 85% for high-quality matches
+    max_results = arguments.get("max_results", None)  # None = unlimited
+    include_contacts = arguments.get("include_contacts", True)
+    page = arguments.get("page", 1)
+    page_size = arguments.get("page_size", 10)
+    use_cache = arguments.get("use_cache", True)
     
-    raise ValueError(f"Unknown tool: {name}")
+    result = await asyncio.to_thread(
+        find_lookalikes_from_company_data,
+        company_data, 
+        similarity_threshold, 
+        max_results, 
+        include_contacts,
+        page,
+        page_size,
+        use_cache
+    )
+    return [TextContent(type="text", text=tool_json(result))]
+
+
+# Tool name -> handler; every handler takes the call's arguments dict
+TOOL_HANDLERS = {
+    "search_hubspot_deals": _tool_search_hubspot_deals,
+    "get_organizations_from_definitive": _tool_get_organizations_from_definitive,
+    "get_organization_contacts_by_id": _tool_get_organization_contacts_by_id,
+    "get_databricks_table_schema": _tool_get_databricks_table_schema,
+    "search_healthcare_providers": _tool_search_healthcare_providers,
+    "query_databricks": _tool_query_databricks,
+    "find_lookalikes_from_company_data": _tool_find_lookalikes_from_company_data,
+}
+
+
+@app.call_tool()
+async def call_tool(name: str, arguments: dict) -> list[TextContent]:
+    handler = TOOL_HANDLERS.get(name)
+    if handler is None:
+        raise ValueError(f"Unknown tool: {name}")
+    try:
+        return await handler(arguments)
+    except Exception as e:
+        return [TextContent(type="text", text=f"Error: {str(e)}")]
 
 # Start the server
 if __name__ == '__main__':